@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import asyncio
 from typing import List, Dict, Any, Tuple
 from genworlds.agents.abstracts.thought import AbstractThought
 from genworlds.agents.abstracts.agent_state import AbstractAgentState
@@ -27,6 +28,31 @@ class AbstractActionPlanner(ABC):
         trigger_event = self.fill_triggering_event(action_schema, state)
         return action_schema, trigger_event
 
+    async def aplan_next_action(
+        self, state: AbstractAgentState
+    ) -> Tuple[str, AbstractEvent]:
+        """Async version of plan_next_action, for the agents scheduled on an event loop."""
+        if len(state.current_action_chain) > 0:
+            action_schema = state.current_action_chain.pop(0)
+        else:
+            action_schema = await self.aselect_next_action_schema(state)
+        trigger_event = await self.afill_triggering_event(action_schema, state)
+        return action_schema, trigger_event
+
+    async def aselect_next_action_schema(self, state: AbstractAgentState) -> str:
+        """Override with async thoughts, by default called in the loop executor."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.select_next_action_schema, state
+        )
+
+    async def afill_triggering_event(
+        self, next_action_schema: str, state: AbstractAgentState
+    ) -> Dict[str, Any]:
+        """Override with async thoughts, by default called in the loop executor."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.fill_triggering_event, next_action_schema, state
+        )
+
     @abstractmethod
     def select_next_action_schema(self, state: AbstractAgentState) -> str:
         """Select the next action schema based on the given state.
@@ -1,14 +1,19 @@
+import inspect
 import traceback
 from time import sleep
 import threading
-from typing import List, Type
+from typing import Dict, List, Type
 
 from genworlds.agents.utils.validate_action import validate_action
 from genworlds.agents.abstracts.action_planner import AbstractActionPlanner
 from genworlds.agents.abstracts.state_manager import AbstractStateManager
 from genworlds.events.abstracts.action import AbstractAction
+from genworlds.events.abstracts.event import AbstractEvent
 from genworlds.objects.abstracts.object import AbstractObject
 
+# The events that wake up the agent are handled before any other queued event
+WAKEUP_EVENT_PRIORITY = -10
+
 
 class AbstractAgent(AbstractObject):
     """Abstract interface class for an Agent.
@@ -17,6 +22,8 @@ class AbstractAgent(AbstractObject):
     within a simulation environment.
     """
 
+    event_priorities: Dict[str, int] = {}
+
     def __init__(
         self,
         name: str,
@@ -31,36 +38,50 @@ class AbstractAgent(AbstractObject):
         self.state_manager = state_manager
         super().__init__(name, id, description, host_world_id, actions)
 
+    def get_event_priority(self, event_type: str) -> int:
+        if event_type in self.state_manager.state.wakeup_event_types:
+            return WAKEUP_EVENT_PRIORITY
+        return super().get_event_priority(event_type)
+
     def think_n_do(self):
         """Continuously plans and executes actions based on the agent's state."""
-        while True:
+        while not self.state_manager.is_stopped:
             try:
-                if self.state_manager.state.is_asleep:
-                    sleep(1)
+                # blocks until an event in the wakeup event types arrives
+                if not self.state_manager.wait_until_awake():
                     continue
-                else:
-                    sleep(
-                        0.5
-                    )  # actions that its output take over 0.5 secs have to implement a sleep in the action before finishing
-                    state = self.state_manager.get_updated_state()
-                    sleep(0.5)
-                    action_schema, trigger_event = self.action_planner.plan_next_action(
-                        state
-                    )
-
-                    if action_schema.startswith(self.id):
-                        selected_action = [
-                            action
-                            for action in self.actions
-                            if action.action_schema[0] == action_schema
-                        ][0]
-                        selected_action(trigger_event)
-                    else:
-                        self.send_event(trigger_event)
+                # waits for the answer of the world instead of a fixed delay
+                state = self.state_manager.get_updated_state()
+                action_schema, trigger_event = self.action_planner.plan_next_action(
+                    state
+                )
+                self.do(action_schema, trigger_event)
             except Exception as e:
                 print(f"Error in think_n_do: {e}")
                 traceback.print_exc()
 
+    async def athink_n_do_cycle(self):
+        """One decision cycle of an awake agent."""
+        state = await self.state_manager.aget_updated_state()
+        action_schema, trigger_event = await self.action_planner.aplan_next_action(
+            state
+        )
+        result = self.do(action_schema, trigger_event)
+        if inspect.isawaitable(result):
+            await result
+
+    def do(self, action_schema: str, trigger_event: AbstractEvent):
+        """Runs the planned action if it is one of this agent, otherwise sends its event."""
+        if action_schema.startswith(self.id):
+            selected_action = self.get_action_by_schema(action_schema)
+            return selected_action(trigger_event)
+        self.send_event(trigger_event)
+
+    def stop(self):
+        """Stops thinking and closes the connection of the agent."""
+        self.state_manager.stop()
+        super().stop()
+
     def launch(self):
         """Launches the agent by starting the websocket and thinking threads."""
         self.launch_websocket_thread()
@@ -47,6 +47,12 @@ class AbstractAgentState(BaseModel):
     available_entities: List[str] = Field(
         ..., description="List of available entities in the environment."
     )
+    available_entities_version: Optional[int] = Field(
+        None, description="World version of the available entities."
+    )
+    available_action_schemas_version: Optional[int] = Field(
+        None, description="World version of the available action schemas."
+    )
     is_asleep: bool = Field(..., description="Indicates whether the agent is asleep.")
     current_action_chain: List[str] = Field(
         ..., description="List of action schemas that are currently being executed."
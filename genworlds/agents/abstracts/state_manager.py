@@ -1,11 +1,94 @@
 from abc import ABC, abstractmethod
+import asyncio
+import threading
+from typing import List, Optional, Tuple
 from genworlds.agents.abstracts.agent_state import AbstractAgentState
 
+_condition_lock = threading.Lock()
+
 
 class AbstractStateManager(ABC):
+    """
+    Keeps the state of an agent, and lets its thinking thread block (or its thinking
+    coroutine await) until the agent is woken up instead of polling.
+    """
+
     state: AbstractAgentState
+    # Seconds to wait for the world to answer a state update request
+    state_update_timeout: float = 5.0
+    # Set when the agent is stopped, releases the waits for the wake up
+    is_stopped: bool = False
+
+    @property
+    def _condition(self) -> threading.Condition:
+        # created on first use, so subclasses do not need to call super().__init__()
+        condition = self.__dict__.get("_wake_up_condition")
+        if condition is None:
+            with _condition_lock:
+                condition = self.__dict__.setdefault(
+                    "_wake_up_condition", threading.Condition()
+                )
+        return condition
+
+    @property
+    def _awake_waiters(self) -> List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]:
+        """Coroutines awaiting the wake up, with the loop they are running on."""
+        return self.__dict__.setdefault("_awake_waiter_futures", [])
 
     @abstractmethod
     def get_updated_state(self) -> AbstractAgentState:
         """Retrieve the updated state"""
         pass
+
+    async def aget_updated_state(self) -> AbstractAgentState:
+        """Async version of get_updated_state, by default called in the loop executor."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.get_updated_state
+        )
+
+    def wake_up(self):
+        with self._condition:
+            self.state.is_asleep = False
+            self._notify_waiters()
+
+    def stop(self):
+        with self._condition:
+            self.is_stopped = True
+            self._notify_waiters()
+
+    def _notify_waiters(self):
+        self._condition.notify_all()
+        for loop, waiter in self._awake_waiters:
+            loop.call_soon_threadsafe(_resolve_waiter, waiter)
+        self._awake_waiters.clear()
+
+    def go_to_sleep(self):
+        with self._condition:
+            self.state.is_asleep = True
+
+    def wait_until_awake(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks while the agent is asleep, returns False if still asleep after timeout or
+        if the agent is stopped.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: not self.state.is_asleep or self.is_stopped, timeout=timeout
+            )
+            return not self.state.is_asleep and not self.is_stopped
+
+    async def await_awake(self):
+        """Async version of wait_until_awake, for the agents scheduled on an event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if not self.state.is_asleep or self.is_stopped:
+                    return
+                waiter = loop.create_future()
+                self._awake_waiters.append((loop, waiter))
+            await waiter
+
+
+def _resolve_waiter(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
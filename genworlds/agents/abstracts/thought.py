@@ -1,7 +1,18 @@
+import asyncio
 from abc import ABC, abstractmethod
+import functools
 
 
 class AbstractThought(ABC):
     @abstractmethod
     def run(self, llm_params: dict) -> str:
         """Run the brain with the given parameters and produce a response."""
+
+    async def arun(self, *args, **kwargs):
+        """
+        Async version of run, used by the agents scheduled on an event loop. Override it
+        with an async LLM client, by default run is called in the executor of the loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.run, *args, **kwargs)
+        )
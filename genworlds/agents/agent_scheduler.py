@@ -0,0 +1,106 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import traceback
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict
+
+from genworlds.agents.abstracts.agent import AbstractAgent
+
+
+class AsyncioAgentScheduler:
+    """
+    Runs the think_n_do cycles of the agents as coroutines on one event loop (by default
+    the one shared by the asyncio socket clients) instead of a thinking thread per agent.
+
+    A sleeping agent only costs a pending future, so one process can host thousands of
+    mostly idle agents. Use AsyncSimulationSocketClient, or the open_channel of a
+    MultiplexedSocketClient or an InMemoryEventBus, as the socket_client_class of the
+    agents so their connections do not take a thread each either. The thoughts are awaited
+    through their arun, so they should use async LLM clients.
+
+    max_concurrent_cycles bounds the number of agents thinking at the same time. The
+    queued events of the agents are handled by a shared dispatch_executor instead of a
+    dispatch thread per agent.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop = None,
+        max_concurrent_cycles: int = None,
+        dispatch_executor: Executor = None,
+    ):
+        if loop is None:
+            from genworlds.simulation.sockets.async_client import get_shared_event_loop
+
+            loop = get_shared_event_loop()
+        self.loop = loop
+        self.max_concurrent_cycles = max_concurrent_cycles
+        self._cycle_slots: asyncio.Semaphore = None
+        self.dispatch_executor = dispatch_executor or ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="Agent Event Dispatch"
+        )
+        self.agents: Dict[str, AbstractAgent] = {}
+        self.tasks: Dict[str, concurrent.futures.Future] = {}
+        self.active_cycles_count = 0
+        self.completed_cycles_count = 0
+        self.failed_cycles_count = 0
+
+    def add_agent(self, agent: AbstractAgent, launch_websocket: bool = True):
+        """Schedules the agent, replaces AbstractAgent.launch."""
+        if agent.id in self.tasks:
+            return
+        if agent.dispatch_executor is None:
+            agent.dispatch_executor = self.dispatch_executor
+        if launch_websocket:
+            agent.launch_websocket_thread()
+        self.agents[agent.id] = agent
+        self.tasks[agent.id] = asyncio.run_coroutine_threadsafe(
+            self.run_agent(agent), self.loop
+        )
+
+    def remove_agent(self, agent_id: str):
+        self.agents.pop(agent_id, None)
+        task = self.tasks.pop(agent_id, None)
+        if task:
+            task.cancel()
+
+    async def run_agent(self, agent: AbstractAgent):
+        while True:
+            await agent.state_manager.await_awake()
+            if agent.state_manager.is_stopped:
+                return
+            await self.run_cycle(agent)
+
+    async def run_cycle(self, agent: AbstractAgent):
+        if self._cycle_slots is None and self.max_concurrent_cycles:
+            # created here so it belongs to the loop of the scheduler
+            self._cycle_slots = asyncio.Semaphore(self.max_concurrent_cycles)
+        async with self._cycle_slots or contextlib.nullcontext():
+            self.active_cycles_count += 1
+            try:
+                await agent.athink_n_do_cycle()
+                self.completed_cycles_count += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed_cycles_count += 1
+                print(f"Error in the think_n_do cycle of {agent.id}: {e}")
+                traceback.print_exc()
+            finally:
+                self.active_cycles_count -= 1
+
+    def get_stats(self) -> dict:
+        return {
+            "agents": len(self.agents),
+            "asleep_agents": sum(
+                agent.state_manager.state.is_asleep for agent in self.agents.values()
+            ),
+            "active_cycles": self.active_cycles_count,
+            "completed_cycles": self.completed_cycles_count,
+            "failed_cycles": self.failed_cycles_count,
+        }
+
+    def shutdown(self):
+        for agent_id in list(self.tasks):
+            self.remove_agent(agent_id)
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Type
 import json
 from datetime import datetime
 from genworlds.events.abstracts.event import AbstractEvent
@@ -13,6 +13,8 @@ from genworlds.agents.concrete.basic_assistant.thoughts.event_filler import (
     EventFillerThought,
 )
 from genworlds.agents.abstracts.thought_action import ThoughtAction
+from genworlds.agents.llm.cache import AbstractLLMCache
+from genworlds.agents.llm.gateway import LLMGateway
 from genworlds.utils.schema_to_model import json_schema_to_pydantic_model
 
 
@@ -26,17 +28,23 @@ class BasicAssistantActionPlanner(AbstractActionPlanner):
         initial_agent_state: AbstractAgentState,
         other_thoughts: List[AbstractThought] = [],
         model_name: str = "gpt-3.5-turbo-1106",
+        llm_gateway: LLMGateway = None,
+        llm_cache: AbstractLLMCache = None,
     ):
         self.host_agent = host_agent
         action_schema_selector = ActionSchemaSelectorThought(
             openai_api_key=openai_api_key,
             agent_state=initial_agent_state,
             model_name=model_name,
+            llm_gateway=llm_gateway,
+            llm_cache=llm_cache,
         )
         event_filler = EventFillerThought(
             openai_api_key=openai_api_key,
             agent_state=initial_agent_state,
             model_name=model_name,
+            llm_gateway=llm_gateway,
+            llm_cache=llm_cache,
         )
         other_thoughts = other_thoughts
         super().__init__(
@@ -51,6 +59,18 @@ class BasicAssistantActionPlanner(AbstractActionPlanner):
             next_action_schema,
             updated_plan,
         ) = self.action_schema_selector.run()  # gives enum values
+        return self.update_plan(state, next_action_schema, updated_plan)
+
+    async def aselect_next_action_schema(self, state: AbstractAgentState) -> str:
+        next_action_schema, updated_plan = await self.action_schema_selector.arun()
+        return self.update_plan(state, next_action_schema, updated_plan)
+
+    def update_plan(
+        self,
+        state: AbstractAgentState,
+        next_action_schema: str,
+        updated_plan: List[str],
+    ) -> str:
         state.plan = updated_plan
         if next_action_schema in [el[0] for el in state.action_schema_chains]:
             state.current_action_chain = state.action_schema_chains[
@@ -62,29 +82,47 @@ class BasicAssistantActionPlanner(AbstractActionPlanner):
         self, next_action_schema: str, state: AbstractAgentState
     ) -> Dict[str, Any]:
         # check if is a thought action and compute the missing parameters
-        if next_action_schema.startswith(self.host_agent.id):
-            next_action = [
-                action
-                for action in self.host_agent.actions
-                if next_action_schema == action.action_schema[0]
-            ][0]
-            trigger_event_class = next_action.trigger_event_class
-            if isinstance(next_action, ThoughtAction):
-                for param in next_action.required_thoughts:
-                    thought_class = next_action.required_thoughts[param]
-                    thought = thought_class(self.host_agent.state_manager.state)
-                    state.other_thoughts_filled_parameters[param] = thought.run()
-
-        else:
-            trigger_event_class_schema = json.loads(
-                self.host_agent.state_manager.state.available_action_schemas[
-                    next_action_schema
-                ].split("|")[-1]
-            )
-            trigger_event_class = json_schema_to_pydantic_model(
-                trigger_event_class_schema
-            )
+        trigger_event_class = self.get_trigger_event_class(next_action_schema)
+        for param, thought in self.get_required_thoughts(next_action_schema).items():
+            state.other_thoughts_filled_parameters[param] = thought.run()
 
         trigger_event: AbstractEvent = self.event_filler.run(trigger_event_class)
         trigger_event.created_at = datetime.now().isoformat()
         return trigger_event
+
+    async def afill_triggering_event(
+        self, next_action_schema: str, state: AbstractAgentState
+    ) -> Dict[str, Any]:
+        trigger_event_class = self.get_trigger_event_class(next_action_schema)
+        for param, thought in self.get_required_thoughts(next_action_schema).items():
+            state.other_thoughts_filled_parameters[param] = await thought.arun()
+
+        trigger_event: AbstractEvent = await self.event_filler.arun(trigger_event_class)
+        trigger_event.created_at = datetime.now().isoformat()
+        return trigger_event
+
+    def get_trigger_event_class(self, next_action_schema: str) -> Type[AbstractEvent]:
+        if next_action_schema.startswith(self.host_agent.id):
+            next_action = self.host_agent.get_action_by_schema(next_action_schema)
+            return next_action.trigger_event_class
+
+        trigger_event_class_schema = json.loads(
+            self.host_agent.state_manager.state.available_action_schemas[
+                next_action_schema
+            ].split("|")[-1]
+        )
+        return json_schema_to_pydantic_model(trigger_event_class_schema)
+
+    def get_required_thoughts(
+        self, next_action_schema: str
+    ) -> Dict[str, AbstractThought]:
+        """The thoughts filling the parameters of a thought action, by parameter."""
+        if not next_action_schema.startswith(self.host_agent.id):
+            return {}
+        next_action = self.host_agent.get_action_by_schema(next_action_schema)
+        if not isinstance(next_action, ThoughtAction):
+            return {}
+        return {
+            param: thought_class(self.host_agent.state_manager.state)
+            for param, thought_class in next_action.required_thoughts.items()
+        }
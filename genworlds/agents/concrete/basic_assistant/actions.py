@@ -16,9 +16,17 @@ class UpdateAgentAvailableEntities(AbstractAction):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: WorldSendsAvailableEntitiesEvent):
-        self.host_object.state_manager.state.available_entities = (
-            event.available_entities
+        state = self.host_object.state_manager.state
+        available_entities = merge_state_delta(
+            state.available_entities,
+            state.available_entities_version,
+            event.available_entities,
+            event.removed_entities,
+            event.base_version,
         )
+        if available_entities is not None:
+            state.available_entities = available_entities
+            state.available_entities_version = event.version
 
 
 class UpdateAgentAvailableActionSchemas(AbstractAction):
@@ -29,9 +37,34 @@ class UpdateAgentAvailableActionSchemas(AbstractAction):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: WorldSendsAvailableActionSchemasEvent):
-        self.host_object.state_manager.state.available_action_schemas = (
-            event.available_action_schemas
+        state = self.host_object.state_manager.state
+        available_action_schemas = merge_state_delta(
+            state.available_action_schemas,
+            state.available_action_schemas_version,
+            event.available_action_schemas,
+            event.removed_action_schemas,
+            event.base_version,
         )
+        if available_action_schemas is not None:
+            state.available_action_schemas = available_action_schemas
+            state.available_action_schemas_version = event.version
+
+
+def merge_state_delta(
+    current: dict, current_version: int, changed: dict, removed: list, base_version
+):
+    """
+    Applies a delta sent by the world, returns None if it is not based on the current
+    version (the next request acknowledges the current one, so the world resends it).
+    """
+    if base_version is None:
+        return changed
+    if base_version != current_version:
+        return None
+    merged = {**current, **changed}
+    for key in removed:
+        merged.pop(key, None)
+    return merged
 
 
 class AgentWantsToSleepEvent(AbstractEvent):
@@ -52,7 +85,7 @@ class AgentGoesToSleep(AbstractAction):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: AgentWantsToSleepEvent):
-        self.host_object.state_manager.state.is_asleep = True
+        self.host_object.state_manager.go_to_sleep()
         self.host_object.state_manager.state.plan = []
         self.host_object.send_event(
             AgentGoesToSleepEvent(sender_id=self.host_object.id, target_id=None)
@@ -89,7 +122,7 @@ class AgentListensEvents(AbstractAction):
                 event["event_type"]
                 in self.host_object.state_manager.state.wakeup_event_types
             ):
-                self.host_object.state_manager.state.is_asleep = False
+                self.host_object.state_manager.wake_up()
                 print("Agent is waking up...")
 
 
@@ -18,9 +18,30 @@ from genworlds.agents.concrete.basic_assistant.actions import (
     AgentSpeaksWithAgent,
 )
 from genworlds.agents.abstracts.thought import AbstractThought
+from genworlds.agents.llm.cache import AbstractLLMCache
+from genworlds.agents.llm.gateway import LLMGateway
+from genworlds.worlds.concrete.base.actions import (
+    WorldSendsAvailableEntitiesEvent,
+    WorldSendsAvailableActionSchemasEvent,
+)
+
+# State refreshes are handled after the rest of the queued events
+STATE_REFRESH_EVENT_PRIORITY = 10
+
+STATE_REFRESH_EVENT_TYPES = {
+    WorldSendsAvailableEntitiesEvent.__fields__["event_type"].default,
+    WorldSendsAvailableActionSchemasEvent.__fields__["event_type"].default,
+}
 
 
 class BasicAssistant(AbstractAgent):
+    event_priorities = {
+        event_type: STATE_REFRESH_EVENT_PRIORITY
+        for event_type in STATE_REFRESH_EVENT_TYPES
+    }
+    # Each refresh replaces the whole available entities or action schemas
+    coalesced_event_types = STATE_REFRESH_EVENT_TYPES
+
     def __init__(
         self,
         openai_api_key: str,
@@ -32,9 +53,11 @@ class BasicAssistant(AbstractAgent):
         action_classes: List[type[AbstractAction]] = [],
         other_thoughts: List[AbstractThought] = [],
         model_name: str = "gpt-3.5-turbo-1106",
+        llm_gateway: LLMGateway = None,
+        llm_cache: AbstractLLMCache = None,
     ):
         state_manager = BasicAssistantStateManager(
-            self, initial_agent_state, openai_api_key
+            self, initial_agent_state, openai_api_key, llm_gateway=llm_gateway
         )
         action_planner = BasicAssistantActionPlanner(
             openai_api_key=openai_api_key,
@@ -42,6 +65,8 @@ class BasicAssistant(AbstractAgent):
             other_thoughts=other_thoughts,
             model_name=model_name,
             host_agent=self,
+            llm_gateway=llm_gateway,
+            llm_cache=llm_cache,
         )
 
         actions = []
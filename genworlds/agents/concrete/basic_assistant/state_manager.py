@@ -1,18 +1,29 @@
-from time import sleep
+import asyncio
+import concurrent.futures
 from genworlds.agents.abstracts.state_manager import AbstractStateManager
 from genworlds.agents.abstracts.agent_state import AbstractAgentState
 from genworlds.agents.abstracts.agent import AbstractAgent
 
-from genworlds.worlds.concrete.base.actions import AgentWantsUpdatedStateEvent
+from genworlds.worlds.concrete.base.actions import (
+    AgentWantsUpdatedStateEvent,
+    WorldSendsAvailableEntitiesEvent,
+    WorldSendsAvailableActionSchemasEvent,
+)
 from genworlds.agents.memories.simulation_memory import SimulationMemory
+from genworlds.agents.llm.gateway import LLMGateway
 
 
 class BasicAssistantStateManager(AbstractStateManager):
     """This state manager keeps track of the current state of the agent."""
 
     def __init__(
-        self, host_agent: AbstractAgent, state: AbstractAgentState, openai_api_key: str
+        self,
+        host_agent: AbstractAgent,
+        state: AbstractAgentState,
+        openai_api_key: str,
+        llm_gateway: LLMGateway = None,
     ):
+        super().__init__()
         self.host_agent = host_agent
         self.state = state
         if not state:
@@ -20,7 +31,11 @@ class BasicAssistantStateManager(AbstractStateManager):
         else:
             self.state = state
 
-        self.memory = SimulationMemory(openai_api_key=openai_api_key)
+        self.memory = SimulationMemory(
+            openai_api_key=openai_api_key,
+            agent_id=self.state.id,
+            llm_gateway=llm_gateway,
+        )
 
     def _initialize_state(
         self,
@@ -50,15 +65,42 @@ class BasicAssistantStateManager(AbstractStateManager):
         )
 
     def get_updated_state(self) -> AbstractAgentState:
-        self.host_agent.send_event(
-            AgentWantsUpdatedStateEvent(
-                sender_id=self.host_agent.id, target_id=self.host_agent.host_world_id
+        responses = self.request_updated_state()
+        self.update_last_retrieved_memory()
+        # meanwhile the world processes the request and triggers the basic_assistant actions that update the state
+        try:
+            responses.result(timeout=self.state_update_timeout)
+        except concurrent.futures.TimeoutError:
+            responses.cancel()
+            print("The world did not send the updated state in time...")
+        return self.state
+
+    async def aget_updated_state(self) -> AbstractAgentState:
+        responses = self.request_updated_state()
+        self.update_last_retrieved_memory()
+        try:
+            # cancelling the wrapper cancels the request on timeout
+            await asyncio.wait_for(
+                asyncio.wrap_future(responses), self.state_update_timeout
             )
+        except asyncio.TimeoutError:
+            print("The world did not send the updated state in time...")
+        return self.state
+
+    def request_updated_state(self) -> concurrent.futures.Future:
+        return self.host_agent.request(
+            AgentWantsUpdatedStateEvent(
+                sender_id=self.host_agent.id,
+                target_id=self.host_agent.host_world_id,
+                # the world only sends what changed since these versions
+                entities_version=self.state.available_entities_version,
+                action_schemas_version=self.state.available_action_schemas_version,
+            ),
+            [WorldSendsAvailableEntitiesEvent, WorldSendsAvailableActionSchemasEvent],
         )
-        # retrieve memory and update last_retrieved_memory
+
+    def update_last_retrieved_memory(self):
         query = "No plan" if self.state.plan == [] else str(self.state.plan)
         self.host_agent.state_manager.state.last_retrieved_memory = (
             self.memory.get_event_stream_memories(query=query)
         )
-        # meanwhile the concrete.base world processes the request and triggers the basic_assistant actions that update the state
-        return self.state
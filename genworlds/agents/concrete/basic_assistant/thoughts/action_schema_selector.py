@@ -1,48 +1,44 @@
 from typing import List
-from genworlds.agents.abstracts.agent_state import AbstractAgentState
-from genworlds.agents.abstracts.thought import AbstractThought
-from langchain.chat_models import ChatOpenAI
 from enum import Enum
 from pydantic import BaseModel, Field
 from langchain.chains.openai_functions import (
     create_structured_output_chain,
 )
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
+from genworlds.agents.llm.chain_thought import LLMChainThought
 
 
-class ActionSchemaSelectorThought(AbstractThought):
-    def __init__(
-        self,
-        agent_state: AbstractAgentState,
-        openai_api_key: str,
-        model_name: str = "gpt-3.5-turbo-1106",
-    ):
-        self.agent_state = agent_state
-        self.model_name = model_name
-        self.llm = ChatOpenAI(
-            model=self.model_name, openai_api_key=openai_api_key, temperature=0.1
-        )
+class PlanNextAction(BaseModel):
+    """Plans for the next action to be executed by the agent."""
+
+    action_name: str = Field(
+        ...,
+        description="Selects the action name of the next action to be executed from the list of available action names.",
+    )
+    is_action_valid: bool = Field(
+        ..., description="Determines whether the next action is valid or not."
+    )
+    is_action_valid_reason: str = Field(
+        ...,
+        description="Then explains the rationale of whether it is valid or not valid action.",
+    )
+    new_plan: List[str] = Field(
+        ..., description="The new plan to execute to achieve the goals."
+    )
+
+
+class ActionSchemaSelectorThought(LLMChainThought):
+    model_name = "gpt-3.5-turbo-1106"
 
     def run(self):
-        class PlanNextAction(BaseModel):
-            """Plans for the next action to be executed by the agent."""
+        response = PlanNextAction.parse_obj(self.run_chain())
+        return response.action_name, response.new_plan
 
-            action_name: str = Field(
-                ...,
-                description="Selects the action name of the next action to be executed from the list of available action names.",
-            )
-            is_action_valid: bool = Field(
-                ..., description="Determines whether the next action is valid or not."
-            )
-            is_action_valid_reason: str = Field(
-                ...,
-                description="Then explains the rationale of whether it is valid or not valid action.",
-            )
-            new_plan: List[str] = Field(
-                ..., description="The new plan to execute to achieve the goals."
-            )
+    async def arun(self):
+        response = PlanNextAction.parse_obj(await self.arun_chain())
+        return response.action_name, response.new_plan
 
+    def get_chain_n_inputs(self):
         action_schemas_full_string = "## Available Actions: \n\n"
         for (
             action_schema_key,
@@ -84,7 +80,7 @@ class ActionSchemaSelectorThought(AbstractThought):
             PlanNextAction.schema(), self.llm, prompt, verbose=True
         )
 
-        response = chain.run(
+        inputs = dict(
             agent_name=self.agent_state.name,
             agent_description=self.agent_state.description,
             agent_world_state=self.agent_state.host_world_prompt,
@@ -97,5 +93,4 @@ Also select whether the action is valid or not, and if not, why.
 And finally, state a new updated plan that you want to execute to achieve your goals. If your next action is going to sleep, then you don't need to state a new plan.
             """,
         )
-        response = PlanNextAction.parse_obj(response)
-        return response.action_name, response.new_plan
+        return chain, inputs
@@ -1,30 +1,21 @@
 from typing import Type
 import json
 from genworlds.events.abstracts.event import AbstractEvent
-from genworlds.agents.abstracts.agent_state import AbstractAgentState
-from genworlds.agents.abstracts.thought import AbstractThought
-from langchain.chat_models import ChatOpenAI
 from langchain.chains.openai_functions import (
     create_structured_output_chain,
 )
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
+from genworlds.agents.llm.chain_thought import LLMChainThought
 
 
-class EventFillerThought(AbstractThought):
-    def __init__(
-        self,
-        agent_state: AbstractAgentState,
-        openai_api_key: str,
-        model_name: str = "gpt-3.5-turbo",
-    ):
-        self.agent_state = agent_state
-        self.model_name = model_name
-        self.llm = ChatOpenAI(
-            model=self.model_name, openai_api_key=openai_api_key, temperature=0.1
-        )
-
+class EventFillerThought(LLMChainThought):
     def run(self, trigger_event_class: Type[AbstractEvent]):
+        return trigger_event_class.parse_obj(self.run_chain(trigger_event_class))
+
+    async def arun(self, trigger_event_class: Type[AbstractEvent]):
+        return trigger_event_class.parse_obj(await self.arun_chain(trigger_event_class))
+
+    def get_chain_n_inputs(self, trigger_event_class: Type[AbstractEvent]):
         prompt = ChatPromptTemplate.from_messages(
             [
                 ("system", "You are {agent_name}, {agent_description}."),
@@ -63,7 +54,7 @@ class EventFillerThought(AbstractThought):
             prompt=prompt,
             verbose=True,
         )
-        response = chain.run(
+        inputs = dict(
             agent_name=self.agent_state.name,
             agent_description=self.agent_state.description,
             agent_world_state=self.agent_state.host_world_prompt,
@@ -76,6 +67,4 @@ class EventFillerThought(AbstractThought):
             footer="""Fill the parameters of the triggering event based on the previous context that you have about the world.
             """,
         )
-        response = trigger_event_class.parse_obj(response)
-
-        return response
+        return chain, inputs
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class AbstractLLMCache(ABC):
+    """
+    Cache of LLM responses addressed by a hash of the model, the temperature, the
+    rendered messages and the function schemas of the call, so repeating the exact
+    same call skips the network round trip. Entries older than ttl seconds are misses.
+
+    Cached values are shared, callers must not modify them.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        temperature: float,
+        messages: Any,
+        function_schema: Any = None,
+    ) -> str:
+        content = json.dumps(
+            [model_name, temperature, messages, function_schema],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_chain_key(self, chain, inputs: dict) -> str:
+        """Key of running an LLMChain with the given inputs."""
+        messages = [
+            [message.type, message.content, message.additional_kwargs]
+            for message in chain.prompt.format_prompt(**inputs).to_messages()
+        ]
+        return self.make_key(
+            getattr(chain.llm, "model_name", type(chain.llm).__name__),
+            getattr(chain.llm, "temperature", None),
+            messages,
+            # the function schemas of the structured output chains
+            chain.llm_kwargs,
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._get(key)
+        is_expired = (
+            entry is not None
+            and self.ttl is not None
+            and time.time() - entry[1] > self.ttl
+        )
+        if is_expired:
+            self._delete(key)
+        with self._stats_lock:
+            if entry is None or is_expired:
+                self.misses += 1
+                self.expired += is_expired
+                return None
+            self.hits += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any):
+        self._set(key, value, time.time())
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """The cached value and the time it was cached at."""
+
+    @abstractmethod
+    def _set(self, key: str, value: Any, cached_at: float):
+        pass
+
+    @abstractmethod
+    def _delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class InMemoryLLMCache(AbstractLLMCache):
+    """Keeps the max_size most recently used responses in memory."""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        super().__init__(ttl=ttl)
+        self.max_size = max_size
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set(self, key: str, value: Any, cached_at: float):
+        with self._lock:
+            self._entries[key] = (value, cached_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "evictions": self.evictions}
+
+
+class SQLiteLLMCache(AbstractLLMCache):
+    """
+    Keeps the responses in a SQLite database, so they survive restarts and can be
+    shared by the processes of a simulation. Values must be json serializable.
+    """
+
+    def __init__(self, path: str = "./llm_cache.sqlite", ttl: Optional[float] = None):
+        super().__init__(ttl=ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, cached_at REAL NOT NULL)"
+            )
+
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, cached_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _set(self, key: str, value: Any, cached_at: float):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, cached_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), cached_at),
+            )
+
+    def _delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM llm_cache"
+            ).fetchone()[0]
@@ -0,0 +1,65 @@
+from abc import abstractmethod
+from typing import Any, Tuple
+
+from langchain.chains import LLMChain
+from langchain.chat_models import ChatOpenAI
+
+from genworlds.agents.abstracts.agent_state import AbstractAgentState
+from genworlds.agents.abstracts.thought import AbstractThought
+from genworlds.agents.llm.cache import AbstractLLMCache
+from genworlds.agents.llm.gateway import LLMGateway, get_llm_gateway
+
+
+class LLMChainThought(AbstractThought):
+    """
+    A thought that runs an LLMChain of the agent through the LLM gateway. Subclasses
+    build the chain and its inputs in get_chain_n_inputs, and parse the response of
+    run_chain or arun_chain.
+    """
+
+    model_name: str = "gpt-3.5-turbo"
+    temperature: float = 0.1
+
+    def __init__(
+        self,
+        agent_state: AbstractAgentState,
+        openai_api_key: str,
+        model_name: str = None,
+        llm_gateway: LLMGateway = None,
+        llm_cache: AbstractLLMCache = None,
+    ):
+        self.agent_state = agent_state
+        if model_name is not None:
+            self.model_name = model_name
+        self.llm_gateway = llm_gateway or get_llm_gateway()
+        # repeated decisions with the same context reuse the cached response
+        self.llm_cache = llm_cache
+        self.llm = ChatOpenAI(
+            model=self.model_name,
+            openai_api_key=openai_api_key,
+            temperature=self.temperature,
+        )
+
+    @abstractmethod
+    def get_chain_n_inputs(self, *args, **kwargs) -> Tuple[LLMChain, dict]:
+        """The chain of the thought and the inputs to run it with."""
+
+    def run_chain(self, *args, **kwargs) -> Any:
+        chain, inputs = self.get_chain_n_inputs(*args, **kwargs)
+        return self.llm_gateway.run_chain(
+            chain,
+            inputs,
+            self.agent_state.id,
+            self.model_name,
+            llm_cache=self.llm_cache,
+        )
+
+    async def arun_chain(self, *args, **kwargs) -> Any:
+        chain, inputs = self.get_chain_n_inputs(*args, **kwargs)
+        return await self.llm_gateway.arun_chain(
+            chain,
+            inputs,
+            self.agent_state.id,
+            self.model_name,
+            llm_cache=self.llm_cache,
+        )
@@ -0,0 +1,388 @@
+from __future__ import annotations
+import asyncio
+import contextlib
+import functools
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from langchain.callbacks import get_openai_callback
+
+from genworlds.agents.llm.cache import AbstractLLMCache
+
+# Used when the agent of an LLM call is unknown
+DEFAULT_AGENT_ID = "default"
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model_name: str):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def estimate_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
+    """Tokens of the text, roughly estimated if the tiktoken encoding is unavailable."""
+    try:
+        return len(_get_encoding(model_name).encode(text))
+    except Exception:
+        return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Budget of units per minute, refilled continuously."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.available = per_minute
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.available = min(
+            self.capacity, self.available + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available, a request larger than the capacity only
+        waits for a full bucket."""
+        self.refill()
+        missing = min(amount, self.capacity) - self.available
+        return max(missing / self.rate, 0.0)
+
+
+class LLMTicket:
+    """An admitted LLM call, released once it finishes with the tokens it really used."""
+
+    def __init__(self, agent_id: str, estimated_tokens: int):
+        self.agent_id = agent_id
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: Optional[int] = None
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self._event = threading.Event()
+        self._loop: asyncio.AbstractEventLoop = None
+        self._future: asyncio.Future = None
+
+    @property
+    def wait_time(self) -> float:
+        return (self.admitted_at or time.monotonic()) - self.enqueued_at
+
+    def _admit(self):
+        self._event.set()
+        if self._future is not None:
+            self._loop.call_soon_threadsafe(_resolve_future, self._future)
+
+
+def _resolve_future(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMGateway:
+    """
+    Admission control shared by the LLM calls of all the agents in the process.
+
+    Calls wait until they fit in the requests_per_minute and tokens_per_minute budgets
+    and under max_concurrent_requests. Waiting calls are admitted round-robin between the
+    agents, an agent with weight n gets up to n calls per round, so a chatty agent can
+    not starve the others. Tokens are reserved with an estimate when admitted, and
+    adjusted with the real usage when the call finishes.
+
+        with get_llm_gateway().request(agent_id, estimated_tokens) as ticket:
+            response = chain.run(...)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = None,
+        tokens_per_minute: int = None,
+        max_concurrent_requests: int = None,
+        agent_weights: Dict[str, int] = None,
+    ):
+        self._condition = threading.Condition()
+        self.configure(
+            requests_per_minute,
+            tokens_per_minute,
+            max_concurrent_requests,
+            agent_weights,
+        )
+        self._queues: Dict[str, Deque[LLMTicket]] = {}
+        # agents with waiting calls, in round-robin order
+        self._round: Deque[str] = deque()
+        self._turns_left = 0
+        self._admission_thread: threading.Thread = None
+        self.running_count = 0
+        self.admitted_count = 0
+        self.used_tokens = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.agent_stats: Dict[str, Dict[str, float]] = {}
+
+    def configure(
+        self,
+        requests_per_minute: int = None,
+        tokens_per_minute: int = None,
+        max_concurrent_requests: int = None,
+        agent_weights: Dict[str, int] = None,
+    ):
+        with self._condition:
+            self.requests_per_minute = requests_per_minute
+            self.tokens_per_minute = tokens_per_minute
+            self.max_concurrent_requests = max_concurrent_requests
+            self.agent_weights = dict(agent_weights or {})
+            self._requests = (
+                TokenBucket(requests_per_minute) if requests_per_minute else None
+            )
+            self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+            self._condition.notify_all()
+
+    def set_agent_weight(self, agent_id: str, weight: int):
+        with self._condition:
+            self.agent_weights[agent_id] = weight
+
+    @contextlib.contextmanager
+    def request(self, agent_id: str = None, estimated_tokens: int = 0):
+        """
+        Blocks until the call is admitted. The tokens used by the OpenAI calls inside are
+        counted, other LLMs can set ticket.used_tokens, otherwise the estimate is kept.
+        """
+        ticket = self.enqueue(agent_id, estimated_tokens)
+        ticket._event.wait()
+        try:
+            with get_openai_callback() as callback:
+                yield ticket
+            if ticket.used_tokens is None and callback.total_tokens:
+                ticket.used_tokens = callback.total_tokens
+        finally:
+            self.release(ticket)
+
+    @contextlib.asynccontextmanager
+    async def arequest(self, agent_id: str = None, estimated_tokens: int = 0):
+        """Async version of request, awaits the admission without blocking the loop."""
+        ticket = LLMTicket(agent_id or DEFAULT_AGENT_ID, estimated_tokens)
+        ticket._loop = asyncio.get_running_loop()
+        ticket._future = ticket._loop.create_future()
+        self.enqueue(ticket=ticket)
+        try:
+            await ticket._future
+        except asyncio.CancelledError:
+            if not self.cancel(ticket):
+                # admitted meanwhile, its reservation is given back
+                self.release(ticket)
+            raise
+        try:
+            with get_openai_callback() as callback:
+                yield ticket
+            if ticket.used_tokens is None and callback.total_tokens:
+                ticket.used_tokens = callback.total_tokens
+        finally:
+            self.release(ticket)
+
+    def run_chain(
+        self,
+        chain,
+        inputs: dict,
+        agent_id: str = None,
+        model_name: str = "gpt-3.5-turbo",
+        llm_cache: AbstractLLMCache = None,
+    ):
+        """
+        Runs an LLMChain once admitted, with the prompt tokens as estimate. Responses
+        found in llm_cache are returned right away, without waiting for admission.
+        """
+        key = llm_cache.get_chain_key(chain, inputs) if llm_cache is not None else None
+        if key is not None:
+            response = llm_cache.get(key)
+            if response is not None:
+                return response
+        with self.request(agent_id, estimate_chain_tokens(chain, inputs, model_name)):
+            response = chain.run(**inputs)
+        if key is not None:
+            llm_cache.set(key, response)
+        return response
+
+    async def arun_chain(
+        self,
+        chain,
+        inputs: dict,
+        agent_id: str = None,
+        model_name: str = "gpt-3.5-turbo",
+        llm_cache: AbstractLLMCache = None,
+    ):
+        key = llm_cache.get_chain_key(chain, inputs) if llm_cache is not None else None
+        if key is not None:
+            response = llm_cache.get(key)
+            if response is not None:
+                return response
+        async with self.arequest(
+            agent_id, estimate_chain_tokens(chain, inputs, model_name)
+        ):
+            response = await chain.arun(**inputs)
+        if key is not None:
+            llm_cache.set(key, response)
+        return response
+
+    def enqueue(
+        self,
+        agent_id: str = None,
+        estimated_tokens: int = 0,
+        ticket: LLMTicket = None,
+    ) -> LLMTicket:
+        ticket = ticket or LLMTicket(agent_id or DEFAULT_AGENT_ID, estimated_tokens)
+        with self._condition:
+            queue = self._queues.setdefault(ticket.agent_id, deque())
+            if not queue:
+                self._round.append(ticket.agent_id)
+            queue.append(ticket)
+            self._admit_ready()
+            if self._round and self._admission_thread is None:
+                self._admission_thread = threading.Thread(
+                    target=self._admit_forever, name="LLM Gateway Thread", daemon=True
+                )
+                self._admission_thread.start()
+            self._condition.notify_all()
+        return ticket
+
+    def cancel(self, ticket: LLMTicket) -> bool:
+        """Removes a waiting call from its queue, False if it was already admitted."""
+        with self._condition:
+            queue = self._queues.get(ticket.agent_id)
+            if not queue or ticket not in queue:
+                return False
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.agent_id]
+                self._round.remove(ticket.agent_id)
+            return True
+
+    def release(self, ticket: LLMTicket):
+        with self._condition:
+            self.running_count -= 1
+            if ticket.used_tokens is not None:
+                self.used_tokens += ticket.used_tokens
+                if self._tokens is not None:
+                    # gives back (or charges) the error of the estimate
+                    self._tokens.refill()
+                    self._tokens.available = min(
+                        self._tokens.capacity,
+                        self._tokens.available
+                        + ticket.estimated_tokens
+                        - ticket.used_tokens,
+                    )
+            self._admit_ready()
+            self._condition.notify_all()
+
+    def _admit_forever(self):
+        with self._condition:
+            while True:
+                wait_time = self._admit_ready()
+                self._condition.wait(timeout=wait_time)
+
+    def _admit_ready(self) -> Optional[float]:
+        """
+        Admits the waiting calls that fit in the budgets, in fair order. Returns the
+        seconds until the next one fits, None if none is waiting or blocked on the
+        concurrency. Must hold the condition.
+        """
+        while self._round:
+            if (
+                self.max_concurrent_requests is not None
+                and self.running_count >= self.max_concurrent_requests
+            ):
+                return None
+            agent_id = self._round[0]
+            ticket = self._queues[agent_id][0]
+            wait_time = 0.0
+            if self._requests is not None:
+                wait_time = self._requests.wait_time(1)
+            if self._tokens is not None:
+                wait_time = max(
+                    wait_time, self._tokens.wait_time(ticket.estimated_tokens)
+                )
+            if wait_time > 0:
+                return wait_time
+
+            if self._requests is not None:
+                self._requests.available -= 1
+            if self._tokens is not None:
+                self._tokens.available -= ticket.estimated_tokens
+            self._queues[agent_id].popleft()
+            self._next_turn(agent_id)
+            self._record_admission(ticket)
+            ticket._admit()
+        return None
+
+    def _next_turn(self, agent_id: str):
+        if self._turns_left <= 0:
+            self._turns_left = max(self.agent_weights.get(agent_id, 1), 1)
+        self._turns_left -= 1
+        if not self._queues[agent_id]:
+            del self._queues[agent_id]
+            self._round.popleft()
+            self._turns_left = 0
+        elif self._turns_left == 0:
+            self._round.rotate(-1)
+
+    def _record_admission(self, ticket: LLMTicket):
+        self.running_count += 1
+        self.admitted_count += 1
+        ticket.admitted_at = time.monotonic()
+        self.total_wait_time += ticket.wait_time
+        self.max_wait_time = max(self.max_wait_time, ticket.wait_time)
+        agent_stats = self.agent_stats.setdefault(
+            ticket.agent_id, {"admitted": 0, "total_wait_time": 0.0}
+        )
+        agent_stats["admitted"] += 1
+        agent_stats["total_wait_time"] += ticket.wait_time
+
+    def get_stats(self) -> dict:
+        with self._condition:
+            return {
+                "waiting": sum(len(queue) for queue in self._queues.values()),
+                "running": self.running_count,
+                "admitted": self.admitted_count,
+                "used_tokens": self.used_tokens,
+                "average_wait_time": self.total_wait_time / max(self.admitted_count, 1),
+                "max_wait_time": self.max_wait_time,
+                "agents": {
+                    agent_id: {
+                        "admitted": stats["admitted"],
+                        "average_wait_time": stats["total_wait_time"]
+                        / stats["admitted"],
+                    }
+                    for agent_id, stats in self.agent_stats.items()
+                },
+            }
+
+
+_default_gateway: Optional[LLMGateway] = None
+_default_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """
+    Gateway shared by the thoughts and memories that are not given one, without limits
+    until configured:
+
+        get_llm_gateway().configure(requests_per_minute=3500, tokens_per_minute=90000)
+    """
+    global _default_gateway
+    with _default_gateway_lock:
+        if _default_gateway is None:
+            _default_gateway = LLMGateway()
+    return _default_gateway
+
+
+def estimate_chain_tokens(chain, inputs: dict, model_name: str = "gpt-3.5-turbo"):
+    """Tokens of the prompt of an LLMChain for the given inputs."""
+    try:
+        return estimate_tokens(chain.prompt.format(**inputs), model_name)
+    except Exception:
+        return estimate_tokens(str(inputs), model_name)
@@ -9,10 +9,20 @@ from langchain.vectorstores import Qdrant
 from langchain.embeddings import OpenAIEmbeddings
 
 from langchain.docstore.document import Document
+from genworlds.agents.llm.gateway import LLMGateway, get_llm_gateway
 
 
 class OneLineEventSummarizer:
-    def __init__(self, openai_api_key: str, model_name: str = "gpt-3.5-turbo-1106"):
+    def __init__(
+        self,
+        openai_api_key: str,
+        model_name: str = "gpt-3.5-turbo-1106",
+        agent_id: str = None,
+        llm_gateway: LLMGateway = None,
+    ):
+        self.model_name = model_name
+        self.agent_id = agent_id
+        self.llm_gateway = llm_gateway or get_llm_gateway()
         self.summary_template = """
         This is The last event coming from a web-socket, it is in JSON format:
         {event}
@@ -38,11 +48,22 @@ class OneLineEventSummarizer:
         """
         Summarize the event in one line.
         """
-        return self.chain.run(event=event)
+        return self.llm_gateway.run_chain(
+            self.chain, {"event": event}, self.agent_id, self.model_name
+        )
 
 
 class FullEventStreamSummarizer:
-    def __init__(self, openai_api_key: str, model_name: str = "gpt-3.5-turbo-1106"):
+    def __init__(
+        self,
+        openai_api_key: str,
+        model_name: str = "gpt-3.5-turbo-1106",
+        agent_id: str = None,
+        llm_gateway: LLMGateway = None,
+    ):
+        self.model_name = model_name
+        self.agent_id = agent_id
+        self.llm_gateway = llm_gateway or get_llm_gateway()
         self.small_summary_template = """
         This is the full event stream coming from a web-socket, it is in JSON format:
         {event_stream}
@@ -73,7 +94,12 @@ class FullEventStreamSummarizer:
         Summarize the event stream in k paragraphs.
         """
         if len(event_stream) <= 100:
-            return self.small_summary_chain.run(event_stream=event_stream, k=k)
+            return self.llm_gateway.run_chain(
+                self.small_summary_chain,
+                {"event_stream": event_stream, "k": k},
+                self.agent_id,
+                self.model_name,
+            )
         else:
             # needs to be implemented
             return ""
@@ -91,6 +117,8 @@ class SimulationMemory:
         n_of_last_events: int = 15,
         n_of_similar_events: int = 5,
         n_of_paragraphs_in_summary: int = 5,
+        agent_id: str = None,
+        llm_gateway: LLMGateway = None,
     ):
         self.n_of_last_events = n_of_last_events  # last events
         self.n_of_similar_events = n_of_similar_events  # similar events
@@ -102,10 +130,16 @@ class SimulationMemory:
         self.world_events = []
         self.summarized_events = []
         self.one_line_summarizer = OneLineEventSummarizer(
-            openai_api_key=openai_api_key, model_name=model_name
+            openai_api_key=openai_api_key,
+            model_name=model_name,
+            agent_id=agent_id,
+            llm_gateway=llm_gateway,
         )
         self.full_event_stream_summarizer = FullEventStreamSummarizer(
-            openai_api_key=openai_api_key, model_name=model_name
+            openai_api_key=openai_api_key,
+            model_name=model_name,
+            agent_id=agent_id,
+            llm_gateway=llm_gateway,
         )
 
         self.embeddings_model = OpenAIEmbeddings(openai_api_key=openai_api_key)
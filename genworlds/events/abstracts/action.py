@@ -1,7 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 import json
-from typing import Any, Type, TypeVar, Generic, Tuple
+from typing import Any, Dict, Type, TypeVar, Generic, Tuple
 
 from genworlds.events.abstracts.event import AbstractEvent
 
@@ -11,18 +11,34 @@ T = TypeVar("T", bound=AbstractEvent)
 class AbstractAction(ABC, Generic[T]):
     trigger_event_class: Type[T]
     description: str
+    # ActionExecutor that runs the action out of the socket thread, None uses the
+    # default executor of the event handler
+    executor: "ActionExecutor" = None
+    # serialized schema of every action class, computed once per class
+    _schema_descriptions: Dict[Type[AbstractAction], str] = {}
 
     def __init__(self, host_object: "AbstractObject"):
         self.host_object = host_object
 
+    @classmethod
+    def get_schema_description(cls) -> str:
+        schema_description = AbstractAction._schema_descriptions.get(cls)
+        if schema_description is None:
+            schema_description = (
+                f"{cls.description}|{cls.trigger_event_class.__fields__['event_type'].default}|"
+                + json.dumps(cls.trigger_event_class.schema())
+            )
+            AbstractAction._schema_descriptions[cls] = schema_description
+        return schema_description
+
+    @property
+    def action_schema_key(self) -> str:
+        return f"{self.host_object.id}:{self.__class__.__name__}"
+
     @property
     def action_schema(self) -> Tuple(str):
         """Returns the action schema as a string"""
-        return (
-            f"{self.host_object.id}:{self.__class__.__name__}",
-            f"{self.description}|{self.trigger_event_class.__fields__['event_type'].default}|"
-            + json.dumps(self.trigger_event_class.schema()),
-        )
+        return (self.action_schema_key, self.get_schema_description())
         # f"{type(self.host_object).__name__}|\n{self.host_object.description}|\n"
 
     @abstractmethod
@@ -1,9 +1,11 @@
 from abc import ABC
 
-from typing import Optional
+from typing import Any, Dict, Optional, Type
 from pydantic import BaseModel, Field
 from datetime import datetime
 
+from genworlds.utils import fast_json
+
 
 class AbstractEvent(ABC, BaseModel):
     event_type: str
@@ -12,3 +14,14 @@ class AbstractEvent(ABC, BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     sender_id: str
     target_id: Optional[str]
+    # id shared by a request event and its responses
+    correlation_id: Optional[str]
+
+    class Config:
+        json_loads = fast_json.loads
+        json_dumps = fast_json.dumps
+
+        @staticmethod
+        def schema_extra(schema: Dict[str, Any], model: Type["AbstractEvent"]):
+            # set by the transport, the schemas are shown to the LLMs filling events
+            schema.get("properties", {}).pop("correlation_id", None)
@@ -3,6 +3,7 @@ from genworlds.simulation.sockets.handlers.event_handler import (
     SimulationSocketEventHandler,
 )
 from genworlds.events.abstracts.action import AbstractAction
+from genworlds.simulation.sockets.handlers.action_executor import ActionExecutor
 
 
 class AbstractObject(SimulationSocketEventHandler):
@@ -21,5 +22,15 @@ class AbstractObject(SimulationSocketEventHandler):
         self.host_world_id = host_world_id
         self.name = name
         self.description = description
+        # action schema key -> action, filled by register_action
+        self.actions_by_schema_key: dict[str, AbstractAction] = {}
 
         super().__init__(id=id, actions=actions)
+
+    def register_action(self, action: AbstractAction, executor: ActionExecutor = None):
+        super().register_action(action, executor)
+        self.actions_by_schema_key[action.action_schema_key] = action
+
+    def get_action_by_schema(self, action_schema: str) -> AbstractAction:
+        """Returns the action of this object with the given action schema key."""
+        return self.actions_by_schema_key[action_schema]
@@ -0,0 +1,144 @@
+import mmap
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Iterator, List, Optional
+
+from genworlds.simulation.journal.record import (
+    RECORD_HEADER,
+    JournalRecord,
+    list_segments,
+)
+
+
+class EventJournalReader:
+    """
+    Reads a journal written by EventJournalWriter through memory-mapped segments.
+
+    Only the record headers are scanned when opening, building a seq/timestamp index
+    so reading can start at any sequence number or point in time without decoding
+    the records before it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.segment_paths: List[str] = []
+        self.segments: List[mmap.mmap] = []
+        self._files = []
+        # index of the records, one entry per record
+        self.seqs = array("Q")
+        self.timestamps = array("d")
+        self.segment_indexes = array("I")
+        self.offsets = array("Q")
+        self._scanned_sizes: List[int] = []
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+    def __iter__(self) -> Iterator[JournalRecord]:
+        return self.read()
+
+    @property
+    def first_seq(self) -> Optional[int]:
+        return self.seqs[0] if self.seqs else None
+
+    @property
+    def last_seq(self) -> Optional[int]:
+        return self.seqs[-1] if self.seqs else None
+
+    def refresh(self):
+        """Maps new segments and indexes records appended since the last refresh."""
+        for segment_path in list_segments(self.path)[len(self.segment_paths) :]:
+            self.segment_paths.append(segment_path)
+            self.segments.append(None)
+            self._files.append(None)
+            self._scanned_sizes.append(0)
+
+        for segment_index, segment_path in enumerate(self.segment_paths):
+            self._map_segment(segment_index)
+            self._scan_segment(segment_index)
+
+    def _map_segment(self, segment_index: int):
+        segment_file = self._files[segment_index]
+        if segment_file is None:
+            segment_file = open(self.segment_paths[segment_index], "rb")
+            self._files[segment_index] = segment_file
+
+        size = segment_file.seek(0, 2)
+        segment = self.segments[segment_index]
+        if size == 0 or (segment is not None and len(segment) == size):
+            return
+        if segment is not None:
+            segment.close()
+        self.segments[segment_index] = mmap.mmap(
+            segment_file.fileno(), 0, access=mmap.ACCESS_READ
+        )
+
+    def _scan_segment(self, segment_index: int):
+        segment = self.segments[segment_index]
+        if segment is None:
+            return
+
+        offset = self._scanned_sizes[segment_index]
+        while offset + RECORD_HEADER.size <= len(segment):
+            length, _, seq, timestamp = RECORD_HEADER.unpack_from(segment, offset)
+            if offset + RECORD_HEADER.size + length > len(segment):
+                # partially written record, it will be indexed on a later refresh
+                break
+            self.seqs.append(seq)
+            self.timestamps.append(timestamp)
+            self.segment_indexes.append(segment_index)
+            self.offsets.append(offset)
+            offset += RECORD_HEADER.size + length
+        self._scanned_sizes[segment_index] = offset
+
+    def position_of_seq(self, seq: int) -> int:
+        """Index of the first record with a sequence number >= seq."""
+        return bisect_left(self.seqs, seq)
+
+    def position_of_timestamp(self, timestamp: float) -> int:
+        """Index of the first record written at or after timestamp."""
+        return bisect_left(self.timestamps, timestamp)
+
+    def get_record(self, position: int) -> JournalRecord:
+        segment = self.segments[self.segment_indexes[position]]
+        offset = self.offsets[position]
+        length, crc, seq, timestamp = RECORD_HEADER.unpack_from(segment, offset)
+        start = offset + RECORD_HEADER.size
+        payload = segment[start : start + length]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Corrupted journal record with seq {seq}")
+        return JournalRecord(seq, timestamp, payload.decode("utf-8"))
+
+    def read(
+        self, start_seq: int = None, start_timestamp: float = None
+    ) -> Iterator[JournalRecord]:
+        """Yields the records from start_seq (or start_timestamp) onwards."""
+        position = 0
+        if start_seq is not None:
+            position = self.position_of_seq(start_seq)
+        elif start_timestamp is not None:
+            position = self.position_of_timestamp(start_timestamp)
+
+        while position < len(self.seqs):
+            yield self.get_record(position)
+            position += 1
+
+    def close(self):
+        for segment in self.segments:
+            if segment is not None:
+                segment.close()
+        for segment_file in self._files:
+            if segment_file is not None:
+                segment_file.close()
+        self.segments = []
+        self._files = []
+        self.segment_paths = []
+        self._scanned_sizes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,28 @@
+import os
+import struct
+from typing import List, NamedTuple
+
+# payload length, payload crc32, seq, unix timestamp
+RECORD_HEADER = struct.Struct("<IIQd")
+SEGMENT_SUFFIX = ".journal"
+
+
+class JournalRecord(NamedTuple):
+    seq: int
+    timestamp: float
+    data: str
+
+
+def segment_file_name(first_seq: int) -> str:
+    return f"{first_seq:020d}{SEGMENT_SUFFIX}"
+
+
+def list_segments(path: str) -> List[str]:
+    """Segment files of a journal directory, oldest first."""
+    if not os.path.isdir(path):
+        return []
+    return [
+        os.path.join(path, file_name)
+        for file_name in sorted(os.listdir(path))
+        if file_name.endswith(SEGMENT_SUFFIX)
+    ]
@@ -0,0 +1,140 @@
+import argparse
+import threading
+import time
+from typing import Callable, List, Optional
+
+import websocket
+
+from genworlds.simulation.journal.reader import EventJournalReader
+from genworlds.simulation.sockets.control_messages import subscribe_message
+from genworlds.simulation.sockets.handlers.event_envelope import EventEnvelope
+from genworlds.simulation.sockets.handlers.event_handler import (
+    SimulationSocketEventHandler,
+)
+
+
+class EventReplayer:
+    """
+    Replays a recorded event journal preserving the recorded pacing.
+
+    speed=1 replays in real time, speed=N N times faster and speed=None as fast as possible.
+    Every record is scheduled at an absolute offset from the start of the replay, so
+    sleeping never accumulates drift and repeated replays deliver the same sequence.
+    """
+
+    def __init__(
+        self,
+        journal_path: str,
+        speed: Optional[float] = 1.0,
+        start_seq: int = None,
+        end_seq: int = None,
+    ):
+        self.journal_path = journal_path
+        self.speed = speed
+        self.start_seq = start_seq
+        self.end_seq = end_seq
+
+    def replay(
+        self, send: Callable[[str], None], stop_event: threading.Event = None
+    ) -> int:
+        """Calls send with every recorded event and returns how many were replayed."""
+        replayed = 0
+        with EventJournalReader(self.journal_path) as reader:
+            replay_start = time.monotonic()
+            first_timestamp = None
+            for record in reader.read(start_seq=self.start_seq):
+                if self.end_seq is not None and record.seq > self.end_seq:
+                    break
+                if stop_event and stop_event.is_set():
+                    break
+
+                if self.speed:
+                    if first_timestamp is None:
+                        first_timestamp = record.timestamp
+                    delay = (record.timestamp - first_timestamp) / self.speed
+                    remaining = replay_start + delay - time.monotonic()
+                    if remaining > 0:
+                        time.sleep(remaining)
+
+                send(record.data)
+                replayed += 1
+        return replayed
+
+    def replay_to_socket(
+        self, url: str = "ws://127.0.0.1:7456/ws", stop_event: threading.Event = None
+    ) -> int:
+        """Feeds the recording through a running socket server."""
+        connection = websocket.create_connection(url)
+        try:
+            # never read, so the server must not relay any event back to it
+            connection.send(subscribe_message([]))
+            return self.replay(connection.send, stop_event)
+        finally:
+            connection.close()
+
+    def replay_to_handlers(
+        self,
+        handlers: List[SimulationSocketEventHandler],
+        stop_event: threading.Event = None,
+    ) -> int:
+        """Feeds the recording directly into the handlers, without any socket."""
+
+        def send(data: str):
+            envelope = EventEnvelope(raw=data)
+            for handler in handlers:
+                handler.process_event(envelope)
+
+        return self.replay(send, stop_event)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded event journal through a world socket server."
+    )
+    parser.add_argument("journal_path", type=str, help="The event journal directory.")
+    parser.add_argument(
+        "--url",
+        type=str,
+        help="The websocket url of the server.",
+        default="ws://127.0.0.1:7456/ws",
+        nargs="?",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        help="Replay speed multiplier, 0 replays as fast as possible.",
+        default=1.0,
+        nargs="?",
+    )
+    parser.add_argument(
+        "--start-seq",
+        type=int,
+        help="Sequence number of the first event to replay.",
+        default=None,
+        nargs="?",
+    )
+    parser.add_argument(
+        "--end-seq",
+        type=int,
+        help="Sequence number of the last event to replay.",
+        default=None,
+        nargs="?",
+    )
+
+    return parser.parse_args()
+
+
+def replay_from_command_line():
+    args = parse_args()
+    replayer = EventReplayer(
+        args.journal_path,
+        speed=args.speed or None,
+        start_seq=args.start_seq,
+        end_seq=args.end_seq,
+    )
+    replayed = replayer.replay_to_socket(args.url)
+    print(f"Replayed {replayed} events")
+
+
+if __name__ == "__main__":
+    replay_from_command_line()
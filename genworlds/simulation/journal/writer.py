@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+import zlib
+from typing import Optional, Union
+
+from genworlds.simulation.journal.reader import EventJournalReader
+from genworlds.simulation.journal.record import RECORD_HEADER, segment_file_name
+
+
+class EventJournalWriter:
+    """
+    Append-only journal of events stored as length-prefixed records in segment files.
+
+    Appending costs O(1) per event: records are written to the current segment,
+    which is rolled over once it reaches max_segment_size, and fsynced in batches
+    of fsync_every records or every fsync_interval seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_segment_size: int = 64 * 1024 * 1024,
+        fsync_every: int = 100,
+        fsync_interval: float = 1.0,
+    ):
+        self.path = path
+        self.max_segment_size = max_segment_size
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        os.makedirs(self.path, exist_ok=True)
+
+        with EventJournalReader(self.path) as reader:
+            self.last_seq = reader.last_seq or 0
+
+        self._lock = threading.Lock()
+        self._segment_file = None
+        self._segment_size = 0
+        self._unsynced_records = 0
+        self._last_sync = time.monotonic()
+
+    def append(
+        self,
+        data: Union[str, bytes],
+        seq: int = None,
+        timestamp: float = None,
+    ) -> int:
+        """Appends a record and returns its sequence number."""
+        payload = data.encode("utf-8") if isinstance(data, str) else data
+        with self._lock:
+            if seq is None:
+                seq = self.last_seq + 1
+            elif seq <= self.last_seq:
+                raise ValueError(
+                    f"Journal sequence numbers must increase, got {seq} after {self.last_seq}"
+                )
+            if timestamp is None:
+                timestamp = time.time()
+
+            if (
+                self._segment_file is None
+                or self._segment_size >= self.max_segment_size
+            ):
+                self._open_segment(seq)
+
+            self._segment_file.write(
+                RECORD_HEADER.pack(len(payload), zlib.crc32(payload), seq, timestamp)
+            )
+            self._segment_file.write(payload)
+            self._segment_size += RECORD_HEADER.size + len(payload)
+            self.last_seq = seq
+
+            self._unsynced_records += 1
+            if (
+                self._unsynced_records >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+        return seq
+
+    def _open_segment(self, first_seq: int):
+        if self._segment_file is not None:
+            self._sync()
+            self._segment_file.close()
+        # a new segment is started on every open, so a torn tail is never appended to
+        self._segment_file = open(
+            os.path.join(self.path, segment_file_name(first_seq)), "ab"
+        )
+        self._segment_size = 0
+
+    def _sync(self):
+        self._segment_file.flush()
+        os.fsync(self._segment_file.fileno())
+        self._unsynced_records = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """Writes and fsyncs every pending record."""
+        with self._lock:
+            if self._segment_file is not None:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._segment_file is not None:
+                self._sync()
+                self._segment_file.close()
+                self._segment_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
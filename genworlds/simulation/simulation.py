@@ -7,6 +7,7 @@ import time
 
 from genworlds.objects.abstracts.object import AbstractObject
 from genworlds.agents.abstracts.agent import AbstractAgent
+from genworlds.agents.agent_scheduler import AsyncioAgentScheduler
 from genworlds.worlds.abstracts.world import AbstractWorld
 
 
@@ -19,6 +20,7 @@ class Simulation:
         objects: List[tuple[AbstractObject, dict]],
         agents: List[tuple[AbstractAgent, dict]],
         stop_event: threading.Event = None,
+        agent_scheduler: AsyncioAgentScheduler = None,
     ):
         self.id = str(uuid4())
         self.name = name
@@ -27,18 +29,22 @@ class Simulation:
         self.objects = objects
         self.agents = agents
         self.stop_event = stop_event
+        # runs the agents on an event loop instead of a thinking thread each
+        self.agent_scheduler = agent_scheduler
+        if agent_scheduler:
+            self.world.agent_scheduler = agent_scheduler
 
     def add_agent(self, agent: AbstractAgent, **world_properties):
         self.agents.append([agent, world_properties])
         self.agents[-1][0].world_spawned_id = self.world.id
+        # launched by the world
         self.world.add_agent(self.agents[-1][0], **self.agents[-1][1])
-        self.agents[-1][0].launch()
 
     def add_object(self, obj: AbstractObject, **world_properties):
         self.objects.append([obj, world_properties])
         self.objects[-1][0].world_spawned_id = self.world.id
+        # launched by the world
         self.world.add_object(self.objects[-1][0], **self.objects[-1][1])
-        self.objects[-1][0].launch_websocket_thread()
 
     # TODO: delete objects and agents
     # TODO: update and restart objects and agents
@@ -60,7 +66,7 @@ class Simulation:
 
         for agent, world_properties in self.agents:
             time.sleep(0.1)
-            agent.launch()
+            self.world.launch_agent(agent)
 
         for obj, world_properties in self.objects:
             time.sleep(0.1)
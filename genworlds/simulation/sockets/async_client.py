@@ -0,0 +1,171 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+import websockets
+
+from genworlds.simulation.sockets.client import AbstractSimulationSocketClient
+from genworlds.utils.logging_factory import LoggingFactory
+
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_loop_lock = threading.Lock()
+_shared_process_executor: Optional[Executor] = None
+
+
+def get_shared_event_loop() -> asyncio.AbstractEventLoop:
+    """Event loop running in a background thread, shared by every asyncio socket client."""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            _shared_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_shared_loop.run_forever,
+                name="Simulation Socket Event Loop Thread",
+                daemon=True,
+            ).start()
+    return _shared_loop
+
+
+def get_shared_process_executor() -> Executor:
+    """Threads running the process_event callbacks of the asyncio socket clients."""
+    global _shared_process_executor
+    with _shared_loop_lock:
+        if _shared_process_executor is None:
+            _shared_process_executor = ThreadPoolExecutor(
+                thread_name_prefix="Simulation Socket Event Processing"
+            )
+    return _shared_process_executor
+
+
+class AsyncSimulationSocketClient(AbstractSimulationSocketClient):
+    """
+    Asyncio implementation of the simulation socket client.
+
+    Instead of one OS thread per connection, every client runs as a task on a single
+    event loop (by default the shared one), so one process can hold thousands of
+    entity connections.
+
+    The received events are processed on process_executor (by default a pool shared by
+    the clients), as the handlers run their actions inline unless they have an action
+    executor. A slow action only delays the next events of its own connection, while
+    the loop keeps serving the others. Pass process_executor=False to call process_event
+    from the event loop, when it never blocks.
+    """
+
+    def __init__(
+        self,
+        process_event,
+        url: str = "ws://127.0.0.1:7456/ws",
+        reconnect_interval=5,
+        log_level=None,
+        entity_id: str = None,
+        resume_on_reconnect: bool = True,
+        loop: asyncio.AbstractEventLoop = None,
+        process_executor: Executor = None,
+    ) -> None:
+        super().__init__(
+            process_event=process_event,
+            url=url,
+            reconnect_interval=reconnect_interval,
+            log_level=log_level,
+            entity_id=entity_id,
+            resume_on_reconnect=resume_on_reconnect,
+        )
+        self.loop = loop
+        if process_executor is None:
+            process_executor = get_shared_process_executor()
+        self.process_executor = process_executor or None
+        self.websocket = None
+        self.task: Optional[asyncio.Task] = None
+        # Frames sent while disconnected are delivered once the connection is back
+        self.outbox: asyncio.Queue[str] = asyncio.Queue()
+        self._unsent: Optional[str] = None
+
+    async def run_forever(self):
+        """Keeps the connection open, reconnecting after reconnect_interval seconds."""
+        self.loop = asyncio.get_running_loop()
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self.websocket = ws
+                    self.is_connected = True
+                    self.logger().info(f"Connected to world socket server {self.url}")
+                    for message in self.handshake_messages():
+                        await ws.send(message)
+                    if self._unsent is not None:
+                        await ws.send(self._unsent)
+                        self._unsent = None
+                    writer = asyncio.create_task(self._write(ws))
+                    try:
+                        async for message in ws:
+                            await self.areceive(message)
+                    finally:
+                        writer.cancel()
+            except (OSError, websockets.WebSocketException) as e:
+                self.logger().error("World socket client error", exc_info=e)
+            finally:
+                self.is_connected = False
+                self.websocket = None
+
+            self.logger().info("World socket client closed connection")
+            if not self.reconnect_interval:
+                break
+            self.logger().info(
+                f"Attempting to reconnect in {self.reconnect_interval} seconds"
+            )
+            await asyncio.sleep(self.reconnect_interval)
+
+    async def areceive(self, message: str):
+        if self.process_executor is None:
+            self.receive(message)
+        else:
+            # one at a time, so the events of the connection keep their order
+            await asyncio.get_running_loop().run_in_executor(
+                self.process_executor, self.receive, message
+            )
+
+    async def _write(self, ws):
+        while True:
+            message = await self.outbox.get()
+            try:
+                await ws.send(message)
+            except websockets.ConnectionClosed:
+                # sent first on the next connection
+                self._unsent = message
+                raise
+            self.logger().debug(f"Sent: {message}")
+
+    async def send(self, message: str):
+        await self.outbox.put(message)
+
+    def send_message(self, message: str):
+        """Thread-safe, the frame is queued and sent from the event loop."""
+        loop = self.loop or get_shared_event_loop()
+        loop.call_soon_threadsafe(self.outbox.put_nowait, message)
+
+    def launch(self, name: str = None):
+        """Schedules the connection on the shared event loop (or the given one)."""
+        self.loop = self.loop or get_shared_event_loop()
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self.loop:
+            self.task = self.loop.create_task(self.run_forever(), name=name)
+        else:
+            asyncio.run_coroutine_threadsafe(self._start(name), self.loop).result()
+
+    async def _start(self, name: str = None):
+        self.task = asyncio.create_task(self.run_forever(), name=name)
+
+    def close(self):
+        self.reconnect_interval = 0
+        if self.task:
+            self.loop.call_soon_threadsafe(self.task.cancel)
+
+    def logger(self):
+        return LoggingFactory.get_logger(
+            self.entity_id or self.__class__.__name__, level=self.log_level
+        )
@@ -1,14 +1,190 @@
+from abc import ABC, abstractmethod
 import threading
-import json
 import time
+from collections import deque
+from typing import Deque, Dict, List, Set
 
 import websocket
 from colorama import Fore
+from pydantic import BaseModel
 
+from genworlds.utils import fast_json
 from genworlds.utils.logging_factory import LoggingFactory
+from genworlds.simulation.sockets.control_messages import (
+    RESUMED,
+    interest_message,
+    is_control_message,
+    register_message,
+    resume_message,
+    subscribe_message,
+    unregister_message,
+)
 
 
-class SimulationSocketClient:
+class AbstractSimulationSocketClient(ABC):
+    """
+    Protocol shared by the simulation socket clients: the handshake sent on every
+    (re)connection and the handling of the received frames.
+    """
+
+    # Number of processed sequence numbers remembered to drop duplicated events
+    seen_seqs_size: int = 10000
+
+    def __init__(
+        self,
+        process_event,
+        url: str = "ws://127.0.0.1:7456/ws",
+        reconnect_interval=5,
+        log_level=None,
+        entity_id: str = None,
+        resume_on_reconnect: bool = True,
+    ) -> None:
+        self.url = url
+        # Callback function to process events
+        self.process_event = process_event
+        self.reconnect_interval = reconnect_interval
+        self.log_level = log_level
+        # Registered on every (re)connection so the server can route targeted events here
+        self.entity_id = entity_id
+        self.entity_ids = [entity_id] if entity_id else []
+        self.event_types = None
+        # Areas of interest set through this connection, by entity id
+        self.interests: Dict[str, str] = {}
+        self.is_connected = False
+        # Last event sequence number seen, used to replay the events missed while disconnected
+        self.resume_on_reconnect = resume_on_reconnect
+        self.last_seq = None
+        self.server_id = None
+        # Recently processed sequence numbers, live events received before the resume
+        # can overtake the replayed ones so a high-water mark is not enough to dedupe
+        self.seen_seqs: Set[int] = set()
+        self._seen_seqs_order: Deque[int] = deque()
+        # Events received while the server replays the missed ones, until RESUMED
+        self.is_resuming = False
+        self.resume_buffer: List[dict] = []
+
+    def handshake_messages(self) -> List[str]:
+        messages = []
+        if self.entity_ids:
+            messages.append(register_message(self.entity_ids))
+        if self.event_types is not None:
+            messages.append(subscribe_message(self.event_types))
+        messages.extend(self.interests.values())
+        if self.resume_on_reconnect:
+            self.is_resuming = True
+            self.resume_buffer = []
+            messages.append(resume_message(self.last_seq, self.server_id))
+        return messages
+
+    def receive(self, message: str):
+        self.logger().debug(f"Received: {message}")
+        event = fast_json.loads(message)
+        if is_control_message(event):
+            self.on_control_message(event)
+        elif self.is_resuming:
+            self.resume_buffer.append(event)
+        else:
+            self.process_received_event(event)
+
+    def process_received_event(self, event: dict):
+        seq = event.get("seq")
+        if seq is not None:
+            if seq in self.seen_seqs:
+                # already processed before reconnecting, or replayed and relayed live
+                return
+            self.mark_seen(seq)
+
+        if self.process_event:
+            self.process_event(event)
+
+    def mark_seen(self, seq: int):
+        self.seen_seqs.add(seq)
+        self._seen_seqs_order.append(seq)
+        if len(self._seen_seqs_order) > self.seen_seqs_size:
+            self.seen_seqs.discard(self._seen_seqs_order.popleft())
+        self.last_seq = seq if self.last_seq is None else max(self.last_seq, seq)
+
+    def on_control_message(self, message):
+        if message["control"] == RESUMED:
+            if message["server_id"] != self.server_id:
+                # new server, sequence numbers start over
+                self.server_id = message["server_id"]
+                self.last_seq = None
+                self.seen_seqs = set()
+                self._seen_seqs_order = deque()
+            if message["missed"]:
+                self.logger().warning(
+                    f"{message['missed']} events were missed while disconnected"
+                )
+            # the replayed and the live events received meanwhile, in relay order
+            buffered_events = sorted(
+                self.resume_buffer, key=lambda event: event.get("seq") or 0
+            )
+            self.is_resuming = False
+            self.resume_buffer = []
+            for event in buffered_events:
+                self.process_received_event(event)
+
+    def register_entity(self, entity_id: str):
+        """Also route the events targeted at entity_id to this connection."""
+        self.entity_ids.append(entity_id)
+        if self.is_connected:
+            self.send_message(register_message([entity_id]))
+
+    def unregister_entity(self, entity_id: str):
+        """Stops routing the events targeted at entity_id to this connection."""
+        if entity_id in self.entity_ids:
+            self.entity_ids.remove(entity_id)
+        if self.is_connected:
+            self.send_message(unregister_message([entity_id]))
+
+    def subscribe(self, event_types):
+        """Only receive events of the given types from now on (and after reconnecting)."""
+        self.event_types = list(event_types)
+        if self.is_connected:
+            self.send_message(subscribe_message(self.event_types))
+
+    def update_interest(
+        self,
+        entity_id: str,
+        location: str = None,
+        position: List[float] = None,
+        radius: float = None,
+    ):
+        """
+        Sets the area of interest of entity_id on the server (and after reconnecting),
+        broadcast events are only delivered between entities with overlapping areas.
+        """
+        message = interest_message(entity_id, location, position, radius)
+        if location is None and position is None:
+            self.interests.pop(entity_id, None)
+        else:
+            self.interests[entity_id] = message
+        if self.is_connected:
+            self.send_message(message)
+
+    @abstractmethod
+    def send_message(self, message: str):
+        """Sends a frame to the server."""
+
+    def send_event(self, event: BaseModel):
+        self.send_message(event.json())
+
+    @abstractmethod
+    def launch(self, name: str = None):
+        """Connects to the server and keeps receiving events in the background."""
+
+    @abstractmethod
+    def close(self):
+        """Disconnects from the server without reconnecting."""
+
+    def logger(self):
+        return LoggingFactory.get_logger(
+            threading.current_thread().name, level=self.log_level
+        )
+
+
+class SimulationSocketClient(AbstractSimulationSocketClient):
     """
     A client for managing connections to a simulation socket server.
     """
@@ -20,8 +196,17 @@ class SimulationSocketClient:
         send_initial_event=None,
         reconnect_interval=5,
         log_level=None,
+        entity_id: str = None,
+        resume_on_reconnect: bool = True,
     ) -> None:
-        self.url = url
+        super().__init__(
+            process_event=process_event,
+            url=url,
+            reconnect_interval=reconnect_interval,
+            log_level=log_level,
+            entity_id=entity_id,
+            resume_on_reconnect=resume_on_reconnect,
+        )
         self.websocket = websocket.WebSocketApp(
             self.url,
             on_open=self.on_open,
@@ -29,14 +214,13 @@ class SimulationSocketClient:
             on_error=self.on_error,
             on_close=self.on_close,
         )
-        # Callback function to process events
-        self.process_event = process_event
         self.send_initial_event = send_initial_event
-        self.reconnect_interval = reconnect_interval
-        self.log_level = log_level
 
     def on_open(self, ws):
         self.logger().info(f"Connected to world socket server {self.url}")
+        self.is_connected = True
+        for message in self.handshake_messages():
+            self.send_message(message)
         if self.send_initial_event:
             self.send_initial_event()
             self.logger().debug(f"Initial event sent")
@@ -45,6 +229,7 @@ class SimulationSocketClient:
         self.logger().error("World socket client error", exc_info=error)
 
     def on_close(self, *args):
+        self.is_connected = False
         self.logger().info("World socket client closed connection", args)
         if self.reconnect_interval:
             self.logger().info(
@@ -55,15 +240,19 @@ class SimulationSocketClient:
             self.websocket.run_forever()
 
     def on_message(self, ws, message):
-        self.logger().debug(f"Received: {message}")
-        if self.process_event:
-            self.process_event(json.loads(message))
+        self.receive(message)
 
     def send_message(self, message):
         self.websocket.send(message)
         self.logger().debug(f"Sent: {message}")
 
-    def logger(self):
-        return LoggingFactory.get_logger(
-            threading.current_thread().name, level=self.log_level
-        )
+    def close(self):
+        self.reconnect_interval = 0
+        self.websocket.close()
+
+    def launch(self, name: str = None):
+        threading.Thread(
+            target=self.websocket.run_forever,
+            name=name,
+            daemon=True,
+        ).start()
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from enum import Enum
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    # Discard the oldest queued frame to make room for the new one
+    DROP_OLDEST = "drop_oldest"
+    # Close the connection of a consumer that can not keep up
+    DISCONNECT = "disconnect"
+    # Wait until there is room, slowing down the sender
+    BLOCK = "block"
+
+
+class ConnectionQueue:
+    """
+    Bounded outbound queue of a single connection, drained by its own task,
+    so a slow consumer never delays delivery to the other connections.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_size: int = 1000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
+        self.websocket = websocket
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_size)
+        self.is_closed = False
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.max_depth = 0
+        self.task = asyncio.create_task(self.drain())
+
+    async def put(self, data: str) -> bool:
+        """Queues a frame, returns False if the consumer has to be disconnected."""
+        if self.is_closed:
+            return False
+
+        if self.queue.full():
+            if self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+                self.queue.get_nowait()
+                self.dropped_count += 1
+            elif self.overflow_policy == OverflowPolicy.DISCONNECT:
+                self.dropped_count += 1
+                return False
+
+        await self.queue.put(data)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    async def drain(self):
+        while True:
+            data = await self.queue.get()
+            try:
+                await self.websocket.send_text(data)
+                self.sent_count += 1
+            except RuntimeError as e:
+                if not (
+                    "Unexpected ASGI message" in str(e) and "websocket.close" in str(e)
+                ):
+                    logger.error(f"Exception: {type(e).__name__}, {e}", exc_info=True)
+                break
+            except Exception as e:
+                logger.error(f"Exception: {type(e).__name__}, {e}", exc_info=True)
+                break
+        self.is_closed = True
+
+    async def close(self):
+        self.is_closed = True
+        self.task.cancel()
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent_count,
+            "dropped": self.dropped_count,
+        }
@@ -0,0 +1,71 @@
+import json
+from typing import List, Optional
+
+# Frames carrying this key are handled by the socket server itself and never relayed
+CONTROL_KEY = "control"
+
+REGISTER = "register"
+UNREGISTER = "unregister"
+SUBSCRIBE = "subscribe"
+RESUME = "resume"
+RESUMED = "resumed"
+INTEREST = "interest"
+
+# Subscribing to this event type receives every event
+WILDCARD_EVENT_TYPE = "*"
+
+
+def is_control_message(message: dict) -> bool:
+    return CONTROL_KEY in message
+
+
+def register_message(entity_ids: List[str]) -> str:
+    """Announces the entities that receive their targeted events over this connection."""
+    return json.dumps({CONTROL_KEY: REGISTER, "entity_ids": entity_ids})
+
+
+def unregister_message(entity_ids: List[str]) -> str:
+    """Stops routing the events targeted at these entities to this connection."""
+    return json.dumps({CONTROL_KEY: UNREGISTER, "entity_ids": entity_ids})
+
+
+def subscribe_message(event_types: List[str]) -> str:
+    """Replaces the set of event types relayed to this connection."""
+    return json.dumps({CONTROL_KEY: SUBSCRIBE, "event_types": event_types})
+
+
+def interest_message(
+    entity_id: str,
+    location: Optional[str] = None,
+    position: Optional[List[float]] = None,
+    radius: Optional[float] = None,
+) -> str:
+    """Sets the area of interest of an entity, without location nor position clears it."""
+    return json.dumps(
+        {
+            CONTROL_KEY: INTEREST,
+            "entity_id": entity_id,
+            "location": location,
+            "position": position,
+            "radius": radius,
+        }
+    )
+
+
+def resume_message(last_seq: Optional[int], server_id: Optional[str]) -> str:
+    """Asks the server to replay the events relayed here after last_seq while disconnected."""
+    return json.dumps(
+        {CONTROL_KEY: RESUME, "last_seq": last_seq, "server_id": server_id}
+    )
+
+
+def resumed_message(server_id: str, last_seq: int, missed: int) -> str:
+    """Follows the replayed events, missed counts the ones no longer in the history."""
+    return json.dumps(
+        {
+            CONTROL_KEY: RESUMED,
+            "server_id": server_id,
+            "last_seq": last_seq,
+            "missed": missed,
+        }
+    )
@@ -0,0 +1,161 @@
+import asyncio
+import inspect
+import threading
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+from genworlds.events.abstracts.action import AbstractAction
+from genworlds.utils.logging_factory import LoggingFactory
+
+ActionCall = Tuple[AbstractAction, Any]
+
+
+class ActionExecutor:
+    """
+    Runs actions outside the thread that receives the events.
+
+    At most max_pending actions are queued or running at once, further submissions block
+    the receiving thread until a slot frees up. Actions submitted with the same lane run
+    one at a time in submission order, which the handlers use to keep per-entity ordering
+    when ordered=True.
+
+    The executor must run the actions in this process, like a ThreadPoolExecutor. Actions
+    hold their host object, with its sockets, threads and locks, so they can not be
+    pickled to a ProcessPoolExecutor.
+    """
+
+    def __init__(
+        self,
+        executor: Executor = None,
+        max_workers: int = 4,
+        max_pending: int = 100,
+        ordered: bool = False,
+        name: str = "Action Executor",
+    ):
+        if isinstance(executor, ProcessPoolExecutor):
+            raise ValueError(
+                "Actions can not run on a ProcessPoolExecutor, they hold their host "
+                "object (sockets, threads and locks) which can not be pickled"
+            )
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self.ordered = ordered
+        self.name = name
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._lanes: Dict[Hashable, Deque[ActionCall]] = {}
+        self.pending_count = 0
+        self.max_pending_count = 0
+        self.completed_count = 0
+        self.failed_count = 0
+
+    def submit(self, action: AbstractAction, event: Any, lane: Hashable = None):
+        self._slots.acquire()
+        with self._lock:
+            self.pending_count += 1
+            self.max_pending_count = max(self.max_pending_count, self.pending_count)
+            if lane is not None and self.ordered:
+                lane_queue = self._lanes.setdefault(lane, deque())
+                lane_queue.append((action, event))
+                if len(lane_queue) > 1:
+                    # started when the actions ahead of it in the lane are done
+                    return
+            else:
+                lane = None
+        self._start((action, event), lane)
+
+    def _start(self, action_call: ActionCall, lane: Optional[Hashable]):
+        future = self._execute(*action_call)
+        future.add_done_callback(
+            lambda future: self._on_done(future, action_call, lane)
+        )
+
+    def _execute(self, action: AbstractAction, event: Any) -> Future:
+        return self.executor.submit(action, event)
+
+    def _on_done(
+        self, future: Future, action_call: ActionCall, lane: Optional[Hashable]
+    ):
+        exception = future.exception()
+        if exception:
+            LoggingFactory.get_logger(self.name).exception(
+                f"Error executing {action_call[0].__class__.__name__}",
+                exc_info=exception,
+            )
+
+        next_action_call = None
+        with self._lock:
+            self.pending_count -= 1
+            if exception:
+                self.failed_count += 1
+            else:
+                self.completed_count += 1
+            if lane is not None:
+                lane_queue = self._lanes[lane]
+                lane_queue.popleft()
+                if lane_queue:
+                    next_action_call = lane_queue[0]
+                else:
+                    del self._lanes[lane]
+        self._slots.release()
+
+        if next_action_call:
+            self._start(next_action_call, lane)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "pending": self.pending_count,
+                "max_pending": self.max_pending_count,
+                "completed": self.completed_count,
+                "failed": self.failed_count,
+                "busy_lanes": len(self._lanes),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+
+class AsyncioActionExecutor(ActionExecutor):
+    """
+    Runs actions on an event loop, by default the one shared by the asyncio socket clients.
+
+    Actions whose __call__ is a coroutine function are awaited on the loop, the others run
+    in the default executor of the loop so they never block it.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop = None,
+        max_pending: int = 100,
+        ordered: bool = False,
+        name: str = "Asyncio Action Executor",
+    ):
+        if loop is None:
+            from genworlds.simulation.sockets.async_client import get_shared_event_loop
+
+            loop = get_shared_event_loop()
+        self.loop = loop
+        super().__init__(
+            executor=None,
+            max_workers=1,
+            max_pending=max_pending,
+            ordered=ordered,
+            name=name,
+        )
+
+    def _execute(self, action: AbstractAction, event: Any) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._run(action, event), self.loop)
+
+    async def _run(self, action: AbstractAction, event: Any):
+        if inspect.iscoroutinefunction(action.__call__):
+            return await action(event)
+        return await self.loop.run_in_executor(None, action, event)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from genworlds.utils import fast_json
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class EventEnvelope:
+    """
+    A received event shared by every handler it is dispatched to in the process.
+
+    The frame is decoded at most once and each pydantic model is only built the first
+    time a listener needs it, then reused by the other listeners. Listeners must treat
+    the decoded dict and the models as read-only.
+    """
+
+    __slots__ = ("_raw", "_data", "_model", "_parsed")
+
+    def __init__(
+        self,
+        raw: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        model: Optional[BaseModel] = None,
+    ):
+        self._raw = raw
+        self._data = data
+        self._model = model
+        self._parsed: Dict[Type[BaseModel], BaseModel] = {}
+
+    @classmethod
+    def wrap(cls, event: EventEnvelope | Dict[str, Any] | BaseModel) -> EventEnvelope:
+        if isinstance(event, EventEnvelope):
+            return event
+        if isinstance(event, BaseModel):
+            return cls(model=event)
+        return cls(data=event)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """The event as decoded json, as the wildcard listeners expect it."""
+        if self._data is None:
+            if self._raw is None:
+                self._raw = self._model.json()
+            self._data = fast_json.loads(self._raw)
+        return self._data
+
+    def get(self, field: str) -> Any:
+        if self._data is None and self._model is not None:
+            return getattr(self._model, field, None)
+        return self.data.get(field)
+
+    @property
+    def event_type(self) -> Optional[str]:
+        return self.get("event_type")
+
+    @property
+    def sender_id(self) -> Optional[str]:
+        return self.get("sender_id")
+
+    @property
+    def target_id(self) -> Optional[str]:
+        return self.get("target_id")
+
+    def parse(self, event_class: Type[T]) -> T:
+        """The event as an instance of event_class, built once per class."""
+        if isinstance(self._model, event_class):
+            return self._model
+        parsed = self._parsed.get(event_class)
+        if parsed is None:
+            if self._data is None and self._model is not None:
+                parsed = event_class.parse_obj(self._model.dict())
+            else:
+                parsed = event_class.parse_obj(self.data)
+            self._parsed[event_class] = parsed
+        return parsed
@@ -1,60 +1,286 @@
 from __future__ import annotations
-from uuid import uuid4
+from concurrent.futures import Executor, Future
 import threading
-from typing import List
+from uuid import uuid4
+from typing import Callable, Dict, List, Set, Type
+from pydantic import BaseModel
 from genworlds.events.abstracts.action import AbstractAction
-from genworlds.simulation.sockets.client import SimulationSocketClient
+from genworlds.simulation.sockets.client import (
+    AbstractSimulationSocketClient,
+    SimulationSocketClient,
+)
 from genworlds.events.abstracts.event import AbstractEvent
+from genworlds.simulation.sockets.handlers.event_envelope import EventEnvelope
+from genworlds.simulation.sockets.handlers.action_executor import ActionExecutor
+from genworlds.simulation.sockets.handlers.pending_request import PendingRequest
+from genworlds.simulation.sockets.handlers.priority_event_queue import (
+    DEFAULT_EVENT_PRIORITY,
+    PriorityEventQueue,
+)
+from genworlds.utils.logging_factory import LoggingFactory
 
 
 class SimulationSocketEventHandler:
+    # Set to AsyncSimulationSocketClient to hold the connections of all the entities
+    # in a single event loop instead of one thread per entity, or to the open_channel
+    # of a MultiplexedSocketClient to share a single connection between them, or to the
+    # open_channel of an InMemoryEventBus to deliver the events without any socket.
+    # Warning: these share threads between the entities, and without an action_executor
+    # the actions run inline. A blocking action (LLM or IO call) then holds a worker of
+    # the pool shared by the AsyncSimulationSocketClients (the whole event loop with
+    # process_executor=False), or the thread of the shared connection or bus, so give
+    # the handlers an action_executor when hosting many entities
+    socket_client_class: Callable[
+        ..., AbstractSimulationSocketClient
+    ] = SimulationSocketClient
+    # Priority of each event type, lower first. When set, the inbound events are queued
+    # and handled by a dispatch thread instead of in arrival order on the socket thread
+    event_priorities: Dict[str, int] = None
+    # Event types that fully replace the previous one, only the newest queued event of
+    # each of these types and target is handled (and parsed)
+    coalesced_event_types: Set[str] = set()
+    # Executor shared by many handlers to handle their queued events, instead of a
+    # dispatch thread each. The events of one handler are still handled one at a time
+    dispatch_executor: Executor = None
+
     def __init__(
         self,
         id: str,
         actions: List[AbstractAction] = [],
         external_event_classes: dict[str, AbstractEvent] = {},
         websocket_url: str = "ws://127.0.0.1:7456/ws",
+        socket_client_class: Callable[..., AbstractSimulationSocketClient] = None,
+        action_executor: ActionExecutor = None,
+        event_priorities: Dict[str, int] = None,
+        coalesced_event_types: Set[str] = None,
+        dispatch_executor: Executor = None,
     ):
         self.event_actions_dict: dict[str, AbstractAction] = {}
         self.id = id if id else str(uuid4())
+        # None runs the actions without an executor inside the socket thread
+        self.action_executor = action_executor
+
+        if event_priorities is None:
+            event_priorities = self.event_priorities
+        self.event_priorities: Dict[str, int] = None
+        self.event_queue: PriorityEventQueue = None
+        self._dispatch_thread: threading.Thread = None
+        self._dispatch_lock = threading.Lock()
+        self._dispatch_scheduled = False
+        self.is_stopped = False
+        if dispatch_executor is not None:
+            self.dispatch_executor = dispatch_executor
+        if event_priorities is not None:
+            self.event_priorities = dict(event_priorities)
+            self.event_queue = PriorityEventQueue()
+
+        if coalesced_event_types is None:
+            coalesced_event_types = self.coalesced_event_types
+        self.coalesced_event_types: Set[str] = set()
+        for event_type in coalesced_event_types:
+            self.set_event_coalescing(event_type)
+
+        # requests waiting for their responses, by correlation id
+        self.pending_requests: Dict[str, PendingRequest] = {}
+        self.response_event_types: Set[str] = set()
+        self._requests_lock = threading.Lock()
+
+        socket_client_class = socket_client_class or self.socket_client_class
+        self.simulation_socket_client = socket_client_class(
+            process_event=self.process_event, url=websocket_url, entity_id=self.id
+        )
+
         self.actions = actions
         for action in self.actions:
             self.register_action(action)
 
-        self.simulation_socket_client = SimulationSocketClient(
-            process_event=self.process_event, url=websocket_url
-        )
-
-    def register_action(self, action: AbstractAction):
+    def register_action(self, action: AbstractAction, executor: ActionExecutor = None):
+        if executor:
+            action.executor = executor
         event_type = action.trigger_event_class.__fields__["event_type"].default
         if event_type not in self.event_actions_dict:
             self.event_actions_dict[event_type] = []
             self.event_actions_dict[event_type].append(action)
+            self.update_subscriptions()
         else:
             self.event_actions_dict[event_type].append(action)
 
-    def process_event(self, event):
-        if event["event_type"] in self.event_actions_dict and (
-            event["target_id"] == None or event["target_id"] == self.id
-        ):
-            # 0 bc the trigger_event_class is the same for all actions with the same event_type
-            parsed_event = self.event_actions_dict[event["event_type"]][
-                0
-            ].trigger_event_class.parse_obj(event)
+    def update_subscriptions(self):
+        # the server only relays the event types this entity has listeners or waits for
+        self.simulation_socket_client.subscribe(
+            self.response_event_types.union(self.event_actions_dict.keys())
+        )
+
+    def set_event_priority(self, event_type: str, priority: int):
+        """Enables the prioritized event queue of this handler."""
+        if self.event_priorities is None:
+            self.event_priorities = {}
+            self.event_queue = PriorityEventQueue()
+        self.event_priorities[event_type] = priority
+
+    def get_event_priority(self, event_type: str) -> int:
+        return self.event_priorities.get(event_type, DEFAULT_EVENT_PRIORITY)
+
+    def set_event_coalescing(self, event_type: str):
+        """
+        Only the newest queued event of this type for each target is handled. The
+        wildcard listeners do not see the superseded events either.
+        """
+        if self.event_queue is None:
+            self.event_priorities = {}
+            self.event_queue = PriorityEventQueue()
+        self.coalesced_event_types.add(event_type)
+
+    def process_event(self, event: EventEnvelope | dict | BaseModel):
+        if self.is_stopped:
+            return
+        envelope = EventEnvelope.wrap(event)
+        if self.event_queue is None:
+            self.handle_event(envelope)
+            return
+
+        event_type = envelope.event_type
+        coalesce_key = None
+        if event_type in self.coalesced_event_types:
+            coalesce_key = (event_type, envelope.target_id)
+        self.event_queue.put(
+            envelope, self.get_event_priority(event_type), coalesce_key
+        )
+        if self.dispatch_executor is not None:
+            self.schedule_dispatch()
+        elif self._dispatch_thread is None:
+            self.start_dispatch_thread()
+
+    def start_dispatch_thread(self):
+        with self._dispatch_lock:
+            if self._dispatch_thread is not None:
+                return
+            self._dispatch_thread = threading.Thread(
+                target=self.dispatch_events,
+                name=f"{self.id} Event Dispatch Thread",
+                daemon=True,
+            )
+            self._dispatch_thread.start()
+
+    def dispatch_events(self):
+        while True:
+            envelope = self.event_queue.get()
+            if envelope is None:
+                # closed by stop
+                return
+            self.handle_queued_event(envelope)
+
+    def schedule_dispatch(self):
+        with self._dispatch_lock:
+            if self._dispatch_scheduled:
+                return
+            self._dispatch_scheduled = True
+        self.dispatch_executor.submit(self.dispatch_queued_events)
+
+    def dispatch_queued_events(self, max_events: int = 100):
+        """
+        Handles the queued events on the dispatch executor, at most max_events before
+        letting the other handlers sharing the executor take their turn.
+        """
+        for _ in range(max_events):
+            envelope = self.event_queue.get(timeout=0)
+            if envelope is None:
+                break
+            self.handle_queued_event(envelope)
+        with self._dispatch_lock:
+            if not len(self.event_queue) or self.event_queue.is_closed:
+                self._dispatch_scheduled = False
+                return
+        self.dispatch_executor.submit(self.dispatch_queued_events)
+
+    def handle_queued_event(self, envelope: EventEnvelope):
+        try:
+            self.handle_event(envelope)
+        except Exception:
+            LoggingFactory.get_logger(self.id).exception(
+                f"Error handling {envelope.event_type}"
+            )
+
+    def handle_event(self, envelope: EventEnvelope):
+        event_type, target_id = envelope.event_type, envelope.target_id
+
+        if target_id == None or target_id == self.id:
+            if event_type in self.event_actions_dict:
+                # 0 bc the trigger_event_class is the same for all actions with the same event_type
+                parsed_event = envelope.parse(
+                    self.event_actions_dict[event_type][0].trigger_event_class
+                )
+
+                for listener in self.event_actions_dict[event_type]:
+                    self.execute_action(listener, parsed_event)
 
-            for listener in self.event_actions_dict[event["event_type"]]:
-                listener(parsed_event)
+            if self.pending_requests:
+                pending_request = self.pending_requests.get(
+                    envelope.get("correlation_id")
+                )
+                if pending_request:
+                    pending_request.add_response(envelope)
 
         if "*" in self.event_actions_dict:
             for listener in self.event_actions_dict["*"]:
-                listener(event)
+                self.execute_action(listener, envelope.data)
+
+    def execute_action(self, action: AbstractAction, event):
+        executor = getattr(action, "executor", None) or self.action_executor
+        if executor is None:
+            action(event)
+        else:
+            # the lane keeps the actions of this entity in order on ordered executors
+            executor.submit(action, event, lane=self.id)
+
+    def get_executor_stats(self) -> List[dict]:
+        executors = {id(self.action_executor): self.action_executor}
+        for actions in self.event_actions_dict.values():
+            for action in actions:
+                executor = getattr(action, "executor", None)
+                executors[id(executor)] = executor
+        return [executor.get_stats() for executor in executors.values() if executor]
 
     def send_event(self, event: AbstractEvent):
-        self.simulation_socket_client.send_message(event.json())
+        self.simulation_socket_client.send_event(event)
+
+    def request(
+        self,
+        event: AbstractEvent,
+        response_event_classes: List[Type[AbstractEvent]],
+    ) -> Future:
+        """
+        Sends the event and returns a future of its responses by event type, the events
+        with its correlation id. The future resolves once one response of each class has
+        been handled by the listeners of this entity (or submitted to their executors).
+        Cancel the future when giving up on the responses.
+
+            responses = agent.request(event, [ResponseEvent]).result(timeout=5)
+        """
+        if event.correlation_id is None:
+            event.correlation_id = str(uuid4())
+        pending_request = PendingRequest(event.correlation_id, response_event_classes)
+        with self._requests_lock:
+            self.pending_requests[event.correlation_id] = pending_request
+            new_response_event_types = (
+                pending_request.response_event_classes.keys()
+                - self.response_event_types
+            )
+            self.response_event_types.update(new_response_event_types)
+        if new_response_event_types:
+            self.update_subscriptions()
+        pending_request.future.add_done_callback(
+            lambda _: self.pending_requests.pop(pending_request.correlation_id, None)
+        )
+        self.send_event(event)
+        return pending_request.future
 
     def launch_websocket_thread(self):
-        threading.Thread(
-            target=self.simulation_socket_client.websocket.run_forever,
-            name=f"{self.id} Thread",
-            daemon=True,
-        ).start()
+        self.simulation_socket_client.launch(name=f"{self.id} Thread")
+
+    def stop(self):
+        """Closes the connection of this entity and stops handling its events."""
+        self.is_stopped = True
+        self.simulation_socket_client.close()
+        if self.event_queue is not None:
+            self.event_queue.close()
@@ -0,0 +1,35 @@
+from concurrent.futures import Future
+from typing import Dict, List, Type
+
+from genworlds.events.abstracts.event import AbstractEvent
+from genworlds.simulation.sockets.handlers.event_envelope import EventEnvelope
+
+
+class PendingRequest:
+    """
+    Responses received for a request event. Its future resolves to the responses by
+    event type once one event of each expected class has arrived.
+    """
+
+    def __init__(
+        self,
+        correlation_id: str,
+        response_event_classes: List[Type[AbstractEvent]],
+    ):
+        self.correlation_id = correlation_id
+        self.response_event_classes: Dict[str, Type[AbstractEvent]] = {
+            event_class.__fields__["event_type"].default: event_class
+            for event_class in response_event_classes
+        }
+        self.responses: Dict[str, AbstractEvent] = {}
+        self.future: Future = Future()
+
+    def add_response(self, envelope: EventEnvelope):
+        event_class = self.response_event_classes.get(envelope.event_type)
+        if event_class is None or envelope.event_type in self.responses:
+            return
+        self.responses[envelope.event_type] = envelope.parse(event_class)
+        if len(self.responses) == len(self.response_event_classes):
+            # a cancelled (timed out) future can not be resolved anymore
+            if self.future.set_running_or_notify_cancel():
+                self.future.set_result(dict(self.responses))
@@ -0,0 +1,89 @@
+import heapq
+import itertools
+import threading
+from typing import Dict, Hashable, List, Optional
+
+from genworlds.simulation.sockets.handlers.event_envelope import EventEnvelope
+
+DEFAULT_EVENT_PRIORITY = 0
+
+
+class PriorityEventQueue:
+    """
+    Thread-safe queue of inbound events, lower priorities are handled first.
+
+    Events with the same priority keep their arrival order. Events put with a coalesce_key
+    replace the queued event with the same key (latest wins), the replaced one is
+    dropped without ever being parsed.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._coalesced_entries: Dict[Hashable, list] = {}
+        self._size = 0
+        self.is_closed = False
+        self.max_depth = 0
+        self.handled_count = 0
+        self.coalesced_count = 0
+
+    def put(
+        self,
+        envelope: EventEnvelope,
+        priority: int = DEFAULT_EVENT_PRIORITY,
+        coalesce_key: Hashable = None,
+    ):
+        entry = [priority, next(self._counter), envelope, coalesce_key]
+        with self._condition:
+            if coalesce_key is not None:
+                superseded_entry = self._coalesced_entries.get(coalesce_key)
+                if superseded_entry is not None:
+                    # left in the heap and skipped by get
+                    superseded_entry[2] = None
+                    self._size -= 1
+                    self.coalesced_count += 1
+                self._coalesced_entries[coalesce_key] = entry
+            heapq.heappush(self._heap, entry)
+            self._size += 1
+            self.max_depth = max(self.max_depth, self._size)
+            self._condition.notify()
+
+    def get(self, timeout: float = None) -> Optional[EventEnvelope]:
+        """
+        Blocks until an event is queued, returns None after timeout seconds or once the
+        queue is closed.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._size or self.is_closed, timeout=timeout
+            )
+            if not self._size or self.is_closed:
+                return None
+            while True:
+                _, _, envelope, coalesce_key = heapq.heappop(self._heap)
+                if envelope is not None:
+                    break
+            if coalesce_key is not None:
+                del self._coalesced_entries[coalesce_key]
+            self._size -= 1
+            self.handled_count += 1
+            return envelope
+
+    def close(self):
+        """Wakes up the consumers, the events still queued are dropped."""
+        with self._condition:
+            self.is_closed = True
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_stats(self) -> dict:
+        with self._condition:
+            return {
+                "queue_depth": self._size,
+                "max_queue_depth": self.max_depth,
+                "handled": self.handled_count,
+                "coalesced": self.coalesced_count,
+            }
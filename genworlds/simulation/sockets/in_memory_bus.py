@@ -0,0 +1,100 @@
+import queue
+import threading
+from typing import Type, Union
+
+from pydantic import BaseModel
+
+from genworlds.simulation.sockets.client import (
+    AbstractSimulationSocketClient,
+    SimulationSocketClient,
+)
+from genworlds.simulation.sockets.handlers.event_envelope import EventEnvelope
+from genworlds.simulation.sockets.multiplexed_client import (
+    MultiplexedChannel,
+    MultiplexedSocketClient,
+)
+from genworlds.utils.logging_factory import LoggingFactory
+
+
+class InMemoryChannel(MultiplexedChannel):
+    def send_event(self, event: BaseModel):
+        self.multiplexed_client.publish(event)
+
+
+class InMemoryEventBus(MultiplexedSocketClient):
+    """
+    Delivers the events between the entities of one process as pydantic models,
+    skipping json serialization and the round trip through the socket server.
+
+    Events are delivered in publishing order by a single dispatcher thread, with the
+    same routing as the socket server. Delivered events are shared between the
+    recipients, so listeners must not modify them.
+
+    When a url is given the bus is also bridged to that socket server for remote clients:
+    local events are forwarded once and remote events are delivered to the local entities.
+
+        event_bus = InMemoryEventBus()
+        SimulationSocketEventHandler.socket_client_class = event_bus.open_channel
+    """
+
+    def __init__(
+        self,
+        url: str = None,
+        socket_client_class: Type[
+            AbstractSimulationSocketClient
+        ] = SimulationSocketClient,
+        log_level=None,
+    ) -> None:
+        super().__init__(
+            url=url, socket_client_class=socket_client_class, log_level=log_level
+        )
+        self.queue: queue.Queue[Union[dict, BaseModel, EventEnvelope]] = queue.Queue()
+
+    def open_channel(
+        self, process_event, url: str = None, entity_id: str = None, **kwargs
+    ) -> InMemoryChannel:
+        # the url of the handlers is ignored, the bus is only bridged to its own url
+        channel = InMemoryChannel(self, process_event, entity_id=entity_id)
+        self.add_channel(channel)
+        return channel
+
+    def publish(self, event: BaseModel):
+        self.queue.put(event)
+        if self.socket_client:
+            self.socket_client.send_message(event.json())
+
+    def send_message(self, message: str):
+        self.queue.put(EventEnvelope(raw=message))
+        if self.socket_client:
+            self.socket_client.send_message(message)
+
+    def dispatch(self, event: dict):
+        """Receives the events relayed by the bridged socket server."""
+        if event.get("sender_id") in self.channels:
+            # already delivered when it was published
+            return
+        self.queue.put(event)
+
+    def deliver_events(self):
+        while True:
+            envelope = EventEnvelope.wrap(self.queue.get())
+            recipients = self.get_recipients(
+                envelope.event_type, envelope.sender_id, envelope.target_id
+            )
+            for channel in recipients:
+                try:
+                    channel.process_event(envelope)
+                except Exception:
+                    LoggingFactory.get_logger(
+                        threading.current_thread().name
+                    ).exception(f"Error delivering event to {channel.entity_id}")
+
+    def launch(self, name: str = "In Memory Event Bus Thread"):
+        """Starts delivering events, no matter how many entities launch their channel."""
+        with self._lock:
+            if self.is_launched:
+                return
+            self.is_launched = True
+        threading.Thread(target=self.deliver_events, name=name, daemon=True).start()
+        if self.socket_client:
+            self.socket_client.launch(name=f"{name} Socket")
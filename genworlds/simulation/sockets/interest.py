@@ -0,0 +1,61 @@
+import math
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+
+class InterestArea(NamedTuple):
+    location: Optional[str] = None
+    position: Optional[Tuple[float, ...]] = None
+    radius: Optional[float] = None
+
+
+class InterestManager:
+    """
+    Area of interest of the entities, set by their world.
+
+    A broadcast event from a sender with an area is only delivered to the entities in
+    the same location, or within the radius of the recipient (or of the sender when the
+    recipient has none) for positions. Entities without an area, like the worlds and the
+    observers, send to and receive from everyone.
+    """
+
+    def __init__(self):
+        self.areas: Dict[str, InterestArea] = {}
+
+    def set_interest(
+        self,
+        entity_id: str,
+        location: str = None,
+        position: Sequence[float] = None,
+        radius: float = None,
+    ):
+        """Setting neither a location nor a position clears the area of the entity."""
+        if location is None and position is None:
+            self.areas.pop(entity_id, None)
+            return
+        if position is not None:
+            position = tuple(position)
+        self.areas[entity_id] = InterestArea(location, position, radius)
+
+    def remove(self, entity_id: str):
+        self.areas.pop(entity_id, None)
+
+    def has_area(self, entity_id: str) -> bool:
+        return entity_id in self.areas
+
+    def is_interested(self, entity_id: str, sender_id: str) -> bool:
+        sender_area = self.areas.get(sender_id)
+        if sender_area is None or entity_id == sender_id:
+            return True
+        area = self.areas.get(entity_id)
+        if area is None:
+            return True
+
+        if sender_area.location is not None and area.location is not None:
+            return sender_area.location == area.location
+        if sender_area.position is not None and area.position is not None:
+            radius = area.radius if area.radius is not None else sender_area.radius
+            return (
+                radius is None
+                or math.dist(area.position, sender_area.position) <= radius
+            )
+        return True
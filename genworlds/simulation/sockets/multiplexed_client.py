@@ -0,0 +1,179 @@
+import threading
+from typing import Dict, List, Optional, Type
+
+from genworlds.simulation.sockets.client import (
+    AbstractSimulationSocketClient,
+    SimulationSocketClient,
+)
+from genworlds.simulation.sockets.control_messages import WILDCARD_EVENT_TYPE
+from genworlds.simulation.sockets.handlers.event_envelope import EventEnvelope
+from genworlds.simulation.sockets.interest import InterestManager
+
+
+class MultiplexedChannel(AbstractSimulationSocketClient):
+    """The view of a shared connection given to one entity."""
+
+    def __init__(
+        self,
+        multiplexed_client: "MultiplexedSocketClient",
+        process_event,
+        entity_id: str = None,
+    ) -> None:
+        super().__init__(
+            process_event=process_event,
+            url=multiplexed_client.url,
+            entity_id=entity_id,
+        )
+        self.multiplexed_client = multiplexed_client
+
+    def subscribe(self, event_types):
+        self.event_types = list(event_types)
+        self.multiplexed_client.update_subscriptions()
+
+    def update_interest(
+        self,
+        entity_id: str,
+        location: str = None,
+        position: List[float] = None,
+        radius: float = None,
+    ):
+        self.multiplexed_client.update_interest(entity_id, location, position, radius)
+
+    def send_message(self, message: str):
+        self.multiplexed_client.send_message(message)
+
+    def launch(self, name: str = None):
+        self.multiplexed_client.launch()
+
+    def close(self):
+        """Leaves the shared connection, which stays open for the other entities."""
+        self.multiplexed_client.remove_channel(self)
+
+
+class MultiplexedSocketClient:
+    """
+    Shares a single websocket between all the entities hosted in one process.
+
+    Every entity id is registered on the same connection and the connection subscribes
+    to the union of their event types. Inbound events are routed locally to the entities
+    by target_id and event_type, so a broadcast event reaches the process only once.
+
+    Pass open_channel as the socket_client_class of the handlers to share the connection:
+
+        multiplexed_client = MultiplexedSocketClient(url)
+        SimulationSocketEventHandler.socket_client_class = multiplexed_client.open_channel
+    """
+
+    def __init__(
+        self,
+        url: str = "ws://127.0.0.1:7456/ws",
+        socket_client_class: Type[
+            AbstractSimulationSocketClient
+        ] = SimulationSocketClient,
+        log_level=None,
+    ) -> None:
+        self.url = url
+        self.socket_client: Optional[AbstractSimulationSocketClient] = None
+        if url:
+            self.socket_client = socket_client_class(
+                process_event=self.dispatch, url=url, log_level=log_level
+            )
+        self.channels: Dict[str, MultiplexedChannel] = {}
+        # the areas of interest set by the worlds hosted in this process
+        self.interest_manager = InterestManager()
+        self.is_launched = False
+        self._lock = threading.Lock()
+
+    def open_channel(
+        self, process_event, url: str = None, entity_id: str = None, **kwargs
+    ) -> MultiplexedChannel:
+        """Same signature as the socket clients, so it can be used as socket_client_class."""
+        if url and url != self.url:
+            raise ValueError(
+                f"Multiplexed client connected to {self.url} can not open a channel to {url}"
+            )
+        channel = MultiplexedChannel(self, process_event, entity_id=entity_id)
+        self.add_channel(channel)
+        return channel
+
+    def add_channel(self, channel: MultiplexedChannel):
+        self.channels[channel.entity_id] = channel
+        if self.socket_client:
+            self.socket_client.register_entity(channel.entity_id)
+
+    def remove_channel(self, channel: MultiplexedChannel):
+        if self.channels.get(channel.entity_id) is not channel:
+            return
+        # its area belongs to its world, which clears it when unregistering the entity
+        del self.channels[channel.entity_id]
+        if self.socket_client:
+            self.socket_client.unregister_entity(channel.entity_id)
+        self.update_subscriptions()
+
+    def update_subscriptions(self):
+        event_types = set()
+        for channel in list(self.channels.values()):
+            if channel.event_types is None:
+                event_types.add(WILDCARD_EVENT_TYPE)
+            else:
+                event_types.update(channel.event_types)
+        if self.socket_client:
+            self.socket_client.subscribe(sorted(event_types))
+
+    def update_interest(
+        self,
+        entity_id: str,
+        location: str = None,
+        position: List[float] = None,
+        radius: float = None,
+    ):
+        self.interest_manager.set_interest(entity_id, location, position, radius)
+        if self.socket_client:
+            self.socket_client.update_interest(entity_id, location, position, radius)
+
+    def dispatch(self, event: dict):
+        # a single envelope, so the event is parsed once for all the local entities
+        envelope = EventEnvelope(data=event)
+        recipients = self.get_recipients(
+            envelope.event_type, envelope.sender_id, envelope.target_id
+        )
+        for channel in recipients:
+            channel.process_event(envelope)
+
+    def get_recipients(
+        self, event_type: str, sender_id: str, target_id: Optional[str]
+    ) -> List[MultiplexedChannel]:
+        if target_id in self.channels:
+            # targeted events are only delivered to their target and echoed to their sender
+            candidates = [self.channels[target_id]]
+            sender_channel = self.channels.get(sender_id)
+            if sender_channel and sender_channel is not candidates[0]:
+                candidates.append(sender_channel)
+        elif self.interest_manager.has_area(sender_id):
+            candidates = [
+                channel
+                for channel in list(self.channels.values())
+                if self.interest_manager.is_interested(channel.entity_id, sender_id)
+            ]
+        else:
+            candidates = list(self.channels.values())
+
+        return [
+            channel
+            for channel in candidates
+            if channel.event_types is None
+            or event_type in channel.event_types
+            or WILDCARD_EVENT_TYPE in channel.event_types
+        ]
+
+    def send_message(self, message: str):
+        self.socket_client.send_message(message)
+
+    def launch(self, name: str = "Multiplexed Socket Thread"):
+        """Connects once, no matter how many entities launch their channel."""
+        with self._lock:
+            if self.is_launched:
+                return
+            self.is_launched = True
+        if self.socket_client:
+            self.socket_client.launch(name=name)
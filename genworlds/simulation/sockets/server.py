@@ -2,39 +2,336 @@ import os
 import sys
 import argparse
 import threading
-from typing import List
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Set
+from uuid import uuid4
 import logging
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 import uvicorn
 
+from genworlds.utils import fast_json
+from genworlds.simulation.journal.writer import EventJournalWriter
+from genworlds.simulation.sockets.connection_queue import (
+    ConnectionQueue,
+    OverflowPolicy,
+)
+from genworlds.simulation.sockets.control_messages import (
+    INTEREST,
+    REGISTER,
+    RESUME,
+    SUBSCRIBE,
+    UNREGISTER,
+    WILDCARD_EVENT_TYPE,
+    is_control_message,
+    resumed_message,
+)
+from genworlds.simulation.sockets.interest import InterestManager
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class RelayedEvent(NamedTuple):
+    seq: int
+    event_type: Optional[str]
+    sender_id: Optional[str]
+    target_id: Optional[str]
+    data: str
+
+
 class WebSocketManager:
-    def __init__(self):
+    """
+    Relays events between connections.
+
+    Connections that register entity ids only receive broadcast events (target_id is null),
+    events targeted at one of their entities and the echo of the events they send.
+    Connections that never register (UIs, recorders) keep receiving every event.
+
+    Connections that subscribe to a set of event types only receive events of those types,
+    unless they subscribe to "*". Connections that never subscribe receive every event type.
+
+    Frames are handed to a bounded queue per connection, so a slow consumer only affects itself
+    according to the overflow policy.
+
+    Broadcast events from an entity with an area of interest (set by its world) are only
+    relayed to the connections hosting an entity in that area, or without any entity.
+
+    Every relayed event gets a monotonic "seq" number and is kept in a bounded history
+    (optionally appended to an event journal), so reconnecting clients can resume where
+    they left off.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        history_size: int = 10000,
+        history_path: str = None,
+    ):
+        self.server_id = str(uuid4())
+        self.last_seq = 0
+        self.history: Deque[RelayedEvent] = deque(maxlen=history_size)
+        self.journal: EventJournalWriter = None
+        if history_path:
+            self.set_history_path(history_path)
+
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
         self.active_connections: List[WebSocket] = []
+        self.connection_queues: Dict[WebSocket, ConnectionQueue] = {}
+        self.disconnected_slow_consumers = 0
+        self.entity_connections: Dict[str, WebSocket] = {}
+        self.connection_entities: Dict[WebSocket, Set[str]] = {}
+        self.event_type_subscribers: Dict[str, Set[WebSocket]] = {}
+        self.connection_event_types: Dict[WebSocket, Set[str]] = {}
+        self.interest_manager = InterestManager()
+        # connection that set the area of each entity (its world's), the area outlives
+        # the reconnections of the entity itself
+        self.interest_owners: Dict[str, WebSocket] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.connection_queues[websocket] = ConnectionQueue(
+            websocket, self.max_queue_size, self.overflow_policy
+        )
 
     async def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        connection_queue = self.connection_queues.pop(websocket, None)
+        if connection_queue:
+            await connection_queue.close()
+        for entity_id in self.connection_entities.pop(websocket, set()):
+            if self.entity_connections.get(entity_id) is websocket:
+                del self.entity_connections[entity_id]
+        for entity_id, owner in list(self.interest_owners.items()):
+            if owner is websocket:
+                del self.interest_owners[entity_id]
+                self.interest_manager.remove(entity_id)
+        self.unsubscribe(websocket)
+
+    def register_entities(self, websocket: WebSocket, entity_ids: List[str]):
+        for entity_id in entity_ids:
+            self.entity_connections[entity_id] = websocket
+            self.connection_entities.setdefault(websocket, set()).add(entity_id)
+
+    def unregister_entities(self, websocket: WebSocket, entity_ids: List[str]):
+        for entity_id in entity_ids:
+            if self.entity_connections.get(entity_id) is websocket:
+                del self.entity_connections[entity_id]
+            self.connection_entities.get(websocket, set()).discard(entity_id)
+
+    def set_interest(self, websocket: WebSocket, message: dict):
+        entity_id = message["entity_id"]
+        self.interest_manager.set_interest(
+            entity_id,
+            message.get("location"),
+            message.get("position"),
+            message.get("radius"),
+        )
+        if self.interest_manager.has_area(entity_id):
+            self.interest_owners[entity_id] = websocket
+        else:
+            self.interest_owners.pop(entity_id, None)
+
+    def subscribe(self, websocket: WebSocket, event_types: List[str]):
+        self.unsubscribe(websocket)
+        self.connection_event_types[websocket] = set(event_types)
+        for event_type in event_types:
+            self.event_type_subscribers.setdefault(event_type, set()).add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket):
+        for event_type in self.connection_event_types.pop(websocket, set()):
+            subscribers = self.event_type_subscribers[event_type]
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.event_type_subscribers[event_type]
+
+    def is_subscribed(self, websocket: WebSocket, event_type: str) -> bool:
+        event_types = self.connection_event_types.get(websocket)
+        return (
+            event_types is None
+            or event_type in event_types
+            or WILDCARD_EVENT_TYPE in event_types
+        )
+
+    def set_history_size(self, history_size: int):
+        self.history = deque(self.history, maxlen=history_size)
+
+    def set_history_path(self, history_path: str):
+        if self.journal:
+            self.journal.close()
+        self.journal = EventJournalWriter(history_path)
+        # keep numbering after the events journaled by a previous run
+        self.last_seq = max(self.last_seq, self.journal.last_seq)
+
+    def record_event(self, message: dict) -> str:
+        self.last_seq += 1
+        message["seq"] = self.last_seq
+        data = fast_json.dumps(message)
+        self.history.append(
+            RelayedEvent(
+                self.last_seq,
+                message.get("event_type"),
+                message.get("sender_id"),
+                message.get("target_id"),
+                data,
+            )
+        )
+        if self.journal:
+            self.journal.append(data, seq=self.last_seq)
+        return data
+
+    async def handle_message(self, websocket: WebSocket, data: str):
+        try:
+            message = fast_json.loads(data)
+        except ValueError:
+            message = None
+
+        if not isinstance(message, dict):
+            await self.send_update(data)
+        elif is_control_message(message):
+            await self.handle_control_message(websocket, message)
+        else:
+            data = self.record_event(message)
+            await self.send_update(data, self.get_recipients(websocket, message))
+
+    async def handle_control_message(self, websocket: WebSocket, message: dict):
+        if message["control"] == REGISTER:
+            self.register_entities(websocket, message.get("entity_ids", []))
+        elif message["control"] == UNREGISTER:
+            self.unregister_entities(websocket, message.get("entity_ids", []))
+        elif message["control"] == SUBSCRIBE:
+            self.subscribe(websocket, message.get("event_types", []))
+        elif message["control"] == INTEREST:
+            self.set_interest(websocket, message)
+        elif message["control"] == RESUME:
+            await self.resume(
+                websocket, message.get("last_seq"), message.get("server_id")
+            )
+        else:
+            logger.warning(f"Unknown control message: {message}")
+
+    async def resume(
+        self, websocket: WebSocket, last_seq: Optional[int], server_id: Optional[str]
+    ):
+        missed = 0
+        if last_seq is None:
+            # first connection, nothing was missed
+            missed_events = []
+        elif server_id != self.server_id:
+            # the server restarted, everything it relayed so far was missed
+            missed_events = list(self.history)
+        else:
+            missed_events = [event for event in self.history if event.seq > last_seq]
+            first_seq = missed_events[0].seq if missed_events else self.last_seq + 1
+            missed = first_seq - last_seq - 1
+        if missed:
+            logger.warning(f"{missed} events are no longer in the history to resume")
+
+        connection_queue = self.connection_queues.get(websocket)
+        if connection_queue is None:
+            return
+        last_seq = self.last_seq
+        for event in missed_events:
+            if self.is_replayed_to(websocket, event):
+                await connection_queue.put(event.data)
+        # sent last, the client holds the live events received until the replay is over
+        await connection_queue.put(resumed_message(self.server_id, last_seq, missed))
+
+    def is_replayed_to(self, websocket: WebSocket, event: RelayedEvent) -> bool:
+        entity_ids = self.connection_entities.get(websocket)
+        if (
+            entity_ids
+            and event.target_id is not None
+            and event.target_id not in entity_ids
+            and event.sender_id not in entity_ids
+        ):
+            return False
+        return self.is_subscribed(websocket, event.event_type)
+
+    def get_recipients(self, sender: WebSocket, event: dict) -> List[WebSocket]:
+        event_type = event.get("event_type")
+        target_id = event.get("target_id")
+        target_connection = self.entity_connections.get(target_id)
+        if target_id is None or target_connection is None:
+            subscribers = self.get_subscribers(event_type)
+            sender_id = event.get("sender_id")
+            if not self.interest_manager.has_area(sender_id):
+                return subscribers
+            return [
+                connection
+                for connection in subscribers
+                if self.is_interested(connection, sender_id)
+            ]
 
-    async def send_update(self, data: str):
+        recipients = [
+            connection
+            for connection in self.active_connections
+            if connection not in self.connection_entities
+        ]
+        for connection in (target_connection, sender):
+            if connection in self.connection_entities and connection not in recipients:
+                recipients.append(connection)
+        return [
+            connection
+            for connection in recipients
+            if self.is_subscribed(connection, event_type)
+        ]
+
+    def is_interested(self, websocket: WebSocket, sender_id: str) -> bool:
+        entity_ids = self.connection_entities.get(websocket)
+        if not entity_ids:
+            return True
+        return any(
+            self.interest_manager.is_interested(entity_id, sender_id)
+            for entity_id in entity_ids
+        )
+
+    def get_subscribers(self, event_type: str) -> List[WebSocket]:
+        subscribers = self.event_type_subscribers.get(event_type, set()).union(
+            self.event_type_subscribers.get(WILDCARD_EVENT_TYPE, set())
+        )
+        return [
+            connection
+            for connection in self.active_connections
+            if connection in subscribers
+            or connection not in self.connection_event_types
+        ]
+
+    async def send_update(self, data: str, recipients: List[WebSocket] = None):
+        if recipients is None:
+            recipients = list(self.active_connections)
         closed_connections = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(data)
-            except RuntimeError as e:
-                if "Unexpected ASGI message" in str(e) and "websocket.close" in str(e):
-                    closed_connections.append(connection)
-                else:
-                    raise e
+        for connection in recipients:
+            connection_queue = self.connection_queues.get(connection)
+            if connection_queue and not await connection_queue.put(data):
+                closed_connections.append(connection)
         for closed_connection in closed_connections:
-            self.active_connections.remove(closed_connection)
+            connection_queue = self.connection_queues.get(closed_connection)
+            if connection_queue and not connection_queue.is_closed:
+                logger.warning("Disconnecting slow consumer")
+                self.disconnected_slow_consumers += 1
+                await closed_connection.close()
+            await self.disconnect(closed_connection)
+
+    def get_stats(self) -> dict:
+        connections = []
+        for connection in self.active_connections:
+            connection_stats = self.connection_queues[connection].get_stats()
+            connection_stats["entity_ids"] = sorted(
+                self.connection_entities.get(connection, set())
+            )
+            connections.append(connection_stats)
+        return {
+            "active_connections": len(self.active_connections),
+            "total_queue_depth": sum(c["queue_depth"] for c in connections),
+            "total_dropped": sum(c["dropped"] for c in connections),
+            "disconnected_slow_consumers": self.disconnected_slow_consumers,
+            "connections": connections,
+        }
 
 
 app = FastAPI()
@@ -46,9 +343,16 @@ socket_server_url = None
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("SIGTERM received, stopping server...")
+    if websocket_manager.journal:
+        websocket_manager.journal.close()
     sys.exit(0)
 
 
+@app.get("/stats")
+async def stats_endpoint():
+    return websocket_manager.get_stats()
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket_manager.connect(websocket)
@@ -57,7 +361,7 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             logger.debug(f"Received data: {data}")
             print(data)
-            await websocket_manager.send_update(data)
+            await websocket_manager.handle_message(websocket, data)
     except WebSocketDisconnect as e:
         logger.warning(f"WebSocketDisconnect: {e.code}")
     except Exception as e:
@@ -66,18 +370,37 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket_manager.disconnect(websocket)
 
 
-def start(host: str = "127.0.0.1", port: int = 7456, silent: bool = False, ws_ping_interval: int = 600, ws_ping_timeout: int = 600, timeout_keep_alive: int = 60):
+def start(
+    host: str = "127.0.0.1",
+    port: int = 7456,
+    silent: bool = False,
+    ws_ping_interval: int = 600,
+    ws_ping_timeout: int = 600,
+    timeout_keep_alive: int = 60,
+    max_queue_size: int = 1000,
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    history_size: int = 10000,
+    history_path: str = None,
+):
+    websocket_manager.max_queue_size = max_queue_size
+    websocket_manager.overflow_policy = OverflowPolicy(overflow_policy)
+    websocket_manager.set_history_size(history_size)
+    if history_path:
+        websocket_manager.set_history_path(history_path)
+
     if silent:
         sys.stdout = open(os.devnull, "w")
         sys.stderr = open(os.devnull, "w")
 
-    uvicorn.run(app, 
-                host=host, 
-                port=port, 
-                log_level="info",
-                ws_ping_interval=ws_ping_interval,
-                ws_ping_timeout=ws_ping_timeout,
-                timeout_keep_alive=timeout_keep_alive)  
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        log_level="info",
+        ws_ping_interval=ws_ping_interval,
+        ws_ping_timeout=ws_ping_timeout,
+        timeout_keep_alive=timeout_keep_alive,
+    )
 
     if silent:
         sys.stdout = sys.__stdout__
@@ -113,6 +436,35 @@ def parse_args():
         default="127.0.0.1",
         nargs="?",
     )
+    parser.add_argument(
+        "--max-queue-size",
+        type=int,
+        help="Maximum number of frames queued for each connection.",
+        default=1000,
+        nargs="?",
+    )
+    parser.add_argument(
+        "--overflow-policy",
+        type=str,
+        help="What to do when a connection queue is full.",
+        choices=[policy.value for policy in OverflowPolicy],
+        default=OverflowPolicy.DROP_OLDEST.value,
+        nargs="?",
+    )
+    parser.add_argument(
+        "--history-size",
+        type=int,
+        help="Number of relayed events kept in memory to resume reconnecting clients.",
+        default=10000,
+        nargs="?",
+    )
+    parser.add_argument(
+        "--history-path",
+        type=str,
+        help="Directory of the event journal where every relayed event is appended.",
+        default=None,
+        nargs="?",
+    )
 
     return parser.parse_args()
 
@@ -120,7 +472,14 @@ def parse_args():
 def start_from_command_line():
     args = parse_args()
     try:
-        start(host=args.host, port=args.port)
+        start(
+            host=args.host,
+            port=args.port,
+            max_queue_size=args.max_queue_size,
+            overflow_policy=args.overflow_policy,
+            history_size=args.history_size,
+            history_path=args.history_path,
+        )
     except BaseException as e:
         logger.error(e)
         sys.exit(0)
@@ -0,0 +1,20 @@
+import json
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:  # pip install genworlds[fast-json], the standard library otherwise
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, default: Callable = None, **kwargs) -> str:
+    # orjson has no equivalent of the formatting options (indent, sort_keys...)
+    if orjson and not kwargs:
+        return orjson.dumps(obj, default=default).decode("utf-8")
+    return json.dumps(obj, default=default, **kwargs)
@@ -0,0 +1,96 @@
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+
+class StateDelta(NamedTuple):
+    version: int
+    # None when the delta is a full snapshot
+    base_version: Optional[int]
+    changed: Dict[str, Any]
+    removed: List[str]
+
+
+class VersionedState:
+    """
+    Tracks a version per entry of a world state dict (entities, action schemas...) and
+    the versions sent to each agent, so the world only sends what changed since the
+    last version acknowledged by the agent.
+
+    The agent acknowledges the version of the last state it applied. When that version
+    is unknown (first contact, or older than the last max_snapshots_per_agent sent ones)
+    the full state is sent instead.
+    """
+
+    def __init__(self, max_snapshots_per_agent: int = 8):
+        self.max_snapshots_per_agent = max_snapshots_per_agent
+        self.entry_versions: Dict[str, int] = {}
+        self._entry_values: Dict[str, Any] = {}
+        self._sent_versions: Dict[str, OrderedDict[int, Dict[str, int]]] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def update(self, entries: Dict[str, Any]):
+        """Replaces all the entries, bumping the version of the ones that changed."""
+        with self._lock:
+            for key in list(self._entry_values):
+                if key not in entries:
+                    self._remove(key)
+            for key, value in entries.items():
+                self._set(key, value)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._set(key, value)
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def _set(self, key: str, value: Any):
+        # models are compared by value, they may be mutated in place afterwards
+        if isinstance(value, BaseModel):
+            value = value.dict()
+        if key not in self._entry_values or self._entry_values[key] != value:
+            self._entry_values[key] = value
+            self.entry_versions[key] = next(self._counter)
+
+    def _remove(self, key: str):
+        self._entry_values.pop(key, None)
+        self.entry_versions.pop(key, None)
+
+    def diff(
+        self, agent_id: str, acked_version: Optional[int], entries: Dict[str, Any]
+    ) -> StateDelta:
+        """
+        Delta between the entries visible to the agent and the ones it acknowledged.
+        entries may be any subset of the tracked entries, e.g. filtered by location.
+        """
+        with self._lock:
+            current_versions = {key: self.entry_versions.get(key, 0) for key in entries}
+            snapshots = self._sent_versions.setdefault(agent_id, OrderedDict())
+            acked_versions = None
+            if acked_version is not None:
+                acked_versions = snapshots.get(acked_version)
+            version = next(self._counter)
+            snapshots[version] = current_versions
+            while len(snapshots) > self.max_snapshots_per_agent:
+                snapshots.popitem(last=False)
+
+        if acked_versions is None:
+            return StateDelta(version, None, dict(entries), [])
+
+        changed = {
+            key: entries[key]
+            for key, entry_version in current_versions.items()
+            if acked_versions.get(key) != entry_version
+        }
+        removed = [key for key in acked_versions if key not in current_versions]
+        return StateDelta(version, acked_version, changed, removed)
+
+    def forget(self, agent_id: str):
+        with self._lock:
+            self._sent_versions.pop(agent_id, None)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from typing import Generic, TypeVar, List, Type
+import threading
+from typing import Generic, Optional, TypeVar, List, Type
 from time import sleep
 from genworlds.objects.abstracts.object import AbstractObject
-from genworlds.worlds.abstracts.world_entity import AbstractWorldEntity
+from genworlds.worlds.abstracts.world_entity import (
+    AbstractWorldEntity,
+    EntityTypeEnum,
+)
+from genworlds.worlds.abstracts.versioned_state import VersionedState
 
 from genworlds.agents.abstracts.agent import AbstractAgent
+from genworlds.agents.agent_scheduler import AsyncioAgentScheduler
 from genworlds.events.abstracts.action import AbstractAction
 from genworlds.simulation.sockets.server import start_thread as socket_server_start
 
@@ -19,6 +25,8 @@ class AbstractWorld(Generic[WorldEntityType], AbstractObject):
 
     entities: dict[str, AbstractWorldEntity]
     action_schemas: dict[str, dict]
+    # Runs the agents on an event loop instead of a thinking thread each, when set
+    agent_scheduler: Optional[AsyncioAgentScheduler] = None
 
     def __init__(
         self,
@@ -35,32 +43,115 @@ class AbstractWorld(Generic[WorldEntityType], AbstractObject):
         self.agents = agents
         self.get_available_entities = get_available_entities
         self.get_available_action_schemas = get_available_action_schemas
+        # versions of the entities and action schemas, to send deltas to the agents
+        self.versioned_entities = VersionedState()
+        self.versioned_action_schemas = VersionedState()
         super().__init__(
             name=name, id=id, description=description, host_world_id=id, actions=actions
         )
 
-    def update_entities(self):
+        # Registry of the entities and their action schemas, only updated when an entity
+        # is added, updated or removed. The dicts are replaced instead of mutated, so the
+        # actions serving the agents can read them without locking
         self.entities = {}
-        self.entities[self.id] = self.get_entity_from_obj(self)
-        for agent in self.agents:
-            self.entities[agent.id] = self.get_entity_from_obj(agent)
+        self.action_schemas = {}
+        self.entity_action_schema_keys: dict[str, list[str]] = {}
+        # bumped on every registry change, invalidates the per-agent caches
+        self.registry_version = 0
+        self._registry_lock = threading.Lock()
+        # agent id -> (registry version, action schemas visible to the agent)
+        self._agent_action_schemas: dict[str, tuple[int, dict[str, str]]] = {}
+        self.update_entities()
+
+    def register_entity(self, obj: AbstractObject):
+        """Adds or replaces the entity of the object and its action schemas."""
+        entity = self.get_entity_from_obj(obj)
+        # computed once, the serialized schemas are served from the registry
+        action_schemas = dict(action.action_schema for action in obj.actions)
+        with self._registry_lock:
+            previous_keys = self.entity_action_schema_keys.get(obj.id, [])
+            self.entities = {**self.entities, obj.id: entity}
+            updated_action_schemas = dict(self.action_schemas)
+            for key in previous_keys:
+                if key not in action_schemas:
+                    del updated_action_schemas[key]
+                    self.versioned_action_schemas.remove(key)
+            updated_action_schemas.update(action_schemas)
+            self.action_schemas = updated_action_schemas
+            self.entity_action_schema_keys[obj.id] = list(action_schemas)
+
+            self.versioned_entities.set(obj.id, entity)
+            for key, value in action_schemas.items():
+                self.versioned_action_schemas.set(key, value)
+            self.registry_version += 1
+
+    def unregister_entity(self, entity_id: str):
+        with self._registry_lock:
+            if entity_id not in self.entities:
+                return
+            self.entities = {
+                key: value for key, value in self.entities.items() if key != entity_id
+            }
+            removed_keys = self.entity_action_schema_keys.pop(entity_id, [])
+            self.action_schemas = {
+                key: value
+                for key, value in self.action_schemas.items()
+                if key not in removed_keys
+            }
+
+            self.versioned_entities.remove(entity_id)
+            for key in removed_keys:
+                self.versioned_action_schemas.remove(key)
+            self._agent_action_schemas.pop(entity_id, None)
+            self.registry_version += 1
+
+    def update_entity(self, obj: AbstractObject):
+        """Call after changing the description or the actions of a hosted entity."""
+        self.register_entity(obj)
 
-        for obj in self.objects:
-            self.entities[obj.id] = self.get_entity_from_obj(obj)
+    def update_entities(self):
+        """Rebuilds the whole registry from the world, its agents and its objects."""
+        hosted_entities = [self, *self.agents, *self.objects]
+        hosted_ids = {obj.id for obj in hosted_entities}
+        for entity_id in list(self.entities):
+            if entity_id not in hosted_ids:
+                self.unregister_entity(entity_id)
+        for obj in hosted_entities:
+            self.register_entity(obj)
 
     def update_action_schemas(self):
-        self.action_schemas = {}
-        for action in self.actions:
-            key, value = action.action_schema
-            self.action_schemas[key] = value
-        for obj in self.objects:
-            for action in obj.actions:
-                key, value = action.action_schema
-                self.action_schemas[key] = value
-        for agent in self.agents:
-            for action in agent.actions:
-                key, value = action.action_schema
-                self.action_schemas[key] = value
+        self.update_entities()
+
+    def get_agent_action_schemas(self, agent_id: str) -> dict[str, str]:
+        """Action schemas visible to the agent, cached until the registry changes."""
+        registry_version = self.registry_version
+        cached_version, action_schemas = self._agent_action_schemas.get(
+            agent_id, (None, None)
+        )
+        if cached_version != registry_version:
+            action_schemas = self.filter_agent_action_schemas(agent_id)
+            self._agent_action_schemas[agent_id] = (registry_version, action_schemas)
+        return action_schemas
+
+    def filter_agent_action_schemas(self, agent_id: str) -> dict[str, str]:
+        """
+        Hides the actions of the world and of the other agents, and the agent's own
+        AgentListensEvents.
+        """
+        entities = self.entities
+        action_schemas = self.action_schemas
+        visible_action_schemas = {}
+        for entity_id, keys in list(self.entity_action_schema_keys.items()):
+            entity = entities.get(entity_id)
+            if entity is None or entity.entity_type == EntityTypeEnum.WORLD:
+                continue
+            if entity.entity_type == EntityTypeEnum.AGENT and entity_id != agent_id:
+                continue
+            for key in keys:
+                if key in action_schemas:
+                    visible_action_schemas[key] = action_schemas[key]
+        visible_action_schemas.pop(f"{agent_id}:AgentListensEvents", None)
+        return visible_action_schemas
 
     def get_entity_from_obj(self, obj: AbstractObject) -> WorldEntityType:
         """
@@ -72,16 +163,43 @@ class AbstractWorld(Generic[WorldEntityType], AbstractObject):
         return self.entities[entity_id]
 
     def add_agent(self, agent: AbstractAgent):
-        self.agents.append(agent)
-        self.agents[-1].host_world_id = self.id
-        self.agents[-1].launch()
+        if agent not in self.agents:
+            self.agents.append(agent)
+        agent.host_world_id = self.id
+        self.register_entity(agent)
+        self.launch_agent(agent)
+
+    def launch_agent(self, agent: AbstractAgent):
+        """Starts the agent, on the agent scheduler if there is one."""
+        if self.agent_scheduler:
+            self.agent_scheduler.add_agent(agent)
+        else:
+            agent.launch()
 
     def add_object(self, obj: AbstractObject):
-        self.objects.append(obj)
-        self.objects[-1].host_world_id = self.id
-        self.objects[-1].launch_websocket_thread()
+        if obj not in self.objects:
+            self.objects.append(obj)
+        obj.host_world_id = self.id
+        self.register_entity(obj)
+        obj.launch_websocket_thread()
+
+    def remove_agent(self, agent_id: str):
+        """Unregisters the agent, stops its thinking and closes its connection."""
+        removed_agents = [agent for agent in self.agents if agent.id == agent_id]
+        self.agents = [agent for agent in self.agents if agent.id != agent_id]
+        self.unregister_entity(agent_id)
+        if self.agent_scheduler:
+            self.agent_scheduler.remove_agent(agent_id)
+        for agent in removed_agents:
+            agent.stop()
+
+    def remove_object(self, object_id: str):
+        removed_objects = [obj for obj in self.objects if obj.id == object_id]
+        self.objects = [obj for obj in self.objects if obj.id != object_id]
+        self.unregister_entity(object_id)
+        for obj in removed_objects:
+            obj.stop()
 
-    # TODO: delete objects and agents by id (stop thread, then remove from list)
     # TODO: update and restart objects and agents close threads and launch new ones
     # TODO: be able to stop the world and restart it
 
@@ -90,10 +208,10 @@ class AbstractWorld(Generic[WorldEntityType], AbstractObject):
         sleep(0.2)
         self.launch_websocket_thread()
         sleep(0.2)
-        for agent in self.agents:
+        for agent in list(self.agents):
             sleep(0.1)
             self.add_agent(agent)
 
-        for obj in self.objects:
+        for obj in list(self.objects):
             sleep(0.1)
             self.add_object(obj)
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from genworlds.objects.abstracts.object import AbstractObject
 from genworlds.events.abstracts.event import AbstractEvent
 from genworlds.events.abstracts.action import AbstractAction
@@ -7,12 +8,19 @@ class AgentWantsUpdatedStateEvent(AbstractEvent):
     event_type = "agent_wants_updated_state"
     description = "Agent wants to update its state."
     # that gives available_action_schemas, and available_entities
+    # versions of the last state applied by the agent, None to get a full snapshot
+    entities_version: Optional[int] = None
+    action_schemas_version: Optional[int] = None
 
 
 class WorldSendsAvailableEntitiesEvent(AbstractEvent):
     event_type = "world_sends_available_entities_event"
     description = "Send available entities."
+    # when base_version is set, only the entities added or changed since that version
     available_entities: dict
+    removed_entities: List[str] = []
+    version: Optional[int] = None
+    base_version: Optional[int] = None
 
 
 class WorldSendsAvailableEntities(AbstractAction):
@@ -23,12 +31,17 @@ class WorldSendsAvailableEntities(AbstractAction):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: AgentWantsUpdatedStateEvent):
-        self.host_object.update_entities()
-        all_entities = self.host_object.entities
+        delta = self.host_object.versioned_entities.diff(
+            event.sender_id, event.entities_version, self.host_object.entities
+        )
         event = WorldSendsAvailableEntitiesEvent(
             sender_id=self.host_object.id,
-            available_entities=all_entities,
+            available_entities=delta.changed,
+            removed_entities=delta.removed,
+            version=delta.version,
+            base_version=delta.base_version,
             target_id=event.sender_id,
+            correlation_id=event.correlation_id,
         )
         self.host_object.send_event(event)
 
@@ -38,7 +51,11 @@ class WorldSendsAvailableActionSchemasEvent(AbstractEvent):
     description = "The world sends the possible action schemas to all the agents."
     world_name: str
     world_description: str
+    # when base_version is set, only the action schemas added or changed since that version
     available_action_schemas: dict[str, str]
+    removed_action_schemas: List[str] = []
+    version: Optional[int] = None
+    base_version: Optional[int] = None
 
 
 class WorldSendsAvailableActionSchemas(AbstractAction):
@@ -49,29 +66,22 @@ class WorldSendsAvailableActionSchemas(AbstractAction):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: AgentWantsUpdatedStateEvent):
-        self.host_object.update_action_schemas()
-        self.host_object.update_entities()
-        all_action_schemas = self.host_object.action_schemas
-        all_entities = self.host_object.entities
-        to_delete = []
-        for action_schema in all_action_schemas:
-            if all_entities[action_schema.split(":")[0]].entity_type == "AGENT" and action_schema.split(":")[0] != event.sender_id:
-                to_delete.append(action_schema)
-
-            if all_entities[action_schema.split(":")[0]].entity_type == "WORLD":
-                to_delete.append(action_schema)
-        
-            if action_schema == f"{event.sender_id}:AgentListensEvents":
-                to_delete.append(action_schema)
-
-        for action_schema in to_delete:
-            del all_action_schemas[action_schema]
-            
+        available_action_schemas = self.host_object.get_agent_action_schemas(
+            event.sender_id
+        )
+        delta = self.host_object.versioned_action_schemas.diff(
+            event.sender_id, event.action_schemas_version, available_action_schemas
+        )
         event = WorldSendsAvailableActionSchemasEvent(
             sender_id=self.host_object.id,
+            target_id=event.sender_id,
+            correlation_id=event.correlation_id,
             world_name=self.host_object.name,
             world_description=self.host_object.description,
-            available_action_schemas=all_action_schemas,
+            available_action_schemas=delta.changed,
+            removed_action_schemas=delta.removed,
+            version=delta.version,
+            base_version=delta.base_version,
         )
         self.host_object.send_event(event)
 
@@ -0,0 +1,91 @@
+from typing import List
+from genworlds.events.abstracts.event import AbstractEvent
+from genworlds.events.abstracts.action import AbstractAction
+from genworlds.objects.abstracts.object import AbstractObject
+from genworlds.worlds.concrete.base.actions import (
+    AgentWantsUpdatedStateEvent,
+    WorldSendsAvailableEntitiesEvent,
+    WorldSendsAvailableActionSchemasEvent,
+)
+
+
+class AgentMovesToNewPosition(AbstractEvent):
+    event_type = "agent_moves_to_new_position"
+    description = "Agent moves to a new position in the world, given as [x, y] or [x, y, z] coordinates."
+    destination_position: List[float]
+
+
+class WorldSetsAgentPositionEvent(AbstractEvent):
+    event_type = "world_sets_agent_position"
+    description = "The new position has been set for the agent."
+    position: List[float]
+
+
+class WorldSetsAgentPosition(AbstractAction):
+    trigger_event_class = AgentMovesToNewPosition
+    description = "The world sets the new position of the agent."
+
+    def __init__(self, host_object: AbstractObject):
+        super().__init__(host_object=host_object)
+
+    def __call__(self, event: AgentMovesToNewPosition):
+        self.host_object.move_entity(event.sender_id, event.destination_position)
+        event = WorldSetsAgentPositionEvent(
+            sender_id=self.host_object.id,
+            target_id=event.sender_id,
+            correlation_id=event.correlation_id,
+            position=event.destination_position,
+        )
+        self.host_object.send_event(event)
+
+
+class WorldSendsNearbyEntities(AbstractAction):
+    trigger_event_class = AgentWantsUpdatedStateEvent
+    description = "Send the entities near the agent."
+
+    def __init__(self, host_object: AbstractObject):
+        super().__init__(host_object=host_object)
+
+    def __call__(self, event: AgentWantsUpdatedStateEvent):
+        nearby_entities = self.host_object.get_nearby_entities(event.sender_id)
+        delta = self.host_object.versioned_entities.diff(
+            event.sender_id, event.entities_version, nearby_entities
+        )
+        event = WorldSendsAvailableEntitiesEvent(
+            sender_id=self.host_object.id,
+            target_id=event.sender_id,
+            correlation_id=event.correlation_id,
+            available_entities=delta.changed,
+            removed_entities=delta.removed,
+            version=delta.version,
+            base_version=delta.base_version,
+        )
+        self.host_object.send_event(event)
+
+
+class WorldSendsNearbyActionSchemas(AbstractAction):
+    trigger_event_class = AgentWantsUpdatedStateEvent
+    description = "Send the action schemas of the entities near the agent."
+
+    def __init__(self, host_object: AbstractObject):
+        super().__init__(host_object=host_object)
+
+    def __call__(self, event: AgentWantsUpdatedStateEvent):
+        nearby_action_schemas = self.host_object.get_nearby_action_schemas(
+            event.sender_id
+        )
+        delta = self.host_object.versioned_action_schemas.diff(
+            event.sender_id, event.action_schemas_version, nearby_action_schemas
+        )
+        event = WorldSendsAvailableActionSchemasEvent(
+            sender_id=self.host_object.id,
+            target_id=event.sender_id,
+            correlation_id=event.correlation_id,
+            world_name=self.host_object.name,
+            world_description=self.host_object.description,
+            available_action_schemas=delta.changed,
+            removed_action_schemas=delta.removed,
+            version=delta.version,
+            base_version=delta.base_version,
+        )
+        self.host_object.send_event(event)
@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import math
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+Position = Tuple[float, ...]
+Cell = Tuple[int, ...]
+
+
+class UniformGridIndex:
+    """
+    Spatial index of 2D or 3D points bucketed in a uniform grid of cubic cells.
+
+    Moving a point only touches its old and new cells, and the radius and k-nearest
+    queries only visit the cells around the center, so their cost depends on the
+    density of the neighbourhood instead of the number of indexed points. Works best
+    with a cell_size close to the usual query radius.
+    """
+
+    def __init__(self, cell_size: float = 10.0):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.positions: Dict[str, Position] = {}
+        self.cells: Dict[Cell, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    def get_cell(self, position: Sequence[float]) -> Cell:
+        return tuple(math.floor(coordinate / self.cell_size) for coordinate in position)
+
+    def insert(self, item_id: str, position: Sequence[float]):
+        """Inserts the item, or moves it if it is already indexed."""
+        position = tuple(position)
+        with self._lock:
+            previous_position = self.positions.get(item_id)
+            if previous_position is not None:
+                if len(previous_position) != len(position):
+                    raise ValueError(
+                        f"Position {position} has not the dimensions of {previous_position}"
+                    )
+                previous_cell = self.get_cell(previous_position)
+                if previous_cell != self.get_cell(position):
+                    self._remove_from_cell(item_id, previous_cell)
+            self.positions[item_id] = position
+            self.cells.setdefault(self.get_cell(position), set()).add(item_id)
+
+    move = insert
+
+    def remove(self, item_id: str):
+        with self._lock:
+            position = self.positions.pop(item_id, None)
+            if position is not None:
+                self._remove_from_cell(item_id, self.get_cell(position))
+
+    def _remove_from_cell(self, item_id: str, cell: Cell):
+        items = self.cells.get(cell)
+        if items is None:
+            return
+        items.discard(item_id)
+        if not items:
+            del self.cells[cell]
+
+    def query_radius(
+        self, center: Sequence[float], radius: float
+    ) -> List[Tuple[str, float]]:
+        """Items within radius of the center, as (item_id, distance) sorted by distance."""
+        center = tuple(center)
+        cell_radius = math.ceil(radius / self.cell_size)
+        center_cell = self.get_cell(center)
+        found = []
+        with self._lock:
+            if (2 * cell_radius + 1) ** len(center) > len(self.cells):
+                # more cells in the radius than occupied ones, visit the occupied ones
+                cells = [
+                    cell
+                    for cell in self.cells
+                    if self._cell_distance(center_cell, cell) <= cell_radius
+                ]
+            else:
+                cells = (
+                    tuple(c + o for c, o in zip(center_cell, offset))
+                    for offset in itertools.product(
+                        range(-cell_radius, cell_radius + 1), repeat=len(center)
+                    )
+                )
+            for cell in cells:
+                for item_id in self.cells.get(cell, ()):
+                    distance = math.dist(center, self.positions[item_id])
+                    if distance <= radius:
+                        found.append((item_id, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearest(
+        self, center: Sequence[float], k: int, max_distance: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """The k items closest to the center, as (item_id, distance) sorted by distance."""
+        center = tuple(center)
+        center_cell = self.get_cell(center)
+        # max-heap of the k best candidates as (-distance, item_id)
+        best: List[Tuple[float, str]] = []
+        with self._lock:
+            remaining = len(self.positions)
+            ring = 0
+            while remaining > 0:
+                # every item in this ring is at least (ring - 1) * cell_size away
+                lower_bound = (ring - 1) * self.cell_size
+                if max_distance is not None and lower_bound > max_distance:
+                    break
+                if len(best) == k and -best[0][0] <= lower_bound:
+                    break
+                if (2 * ring + 1) ** len(center) > len(self.cells):
+                    # sparse far away items, cheaper to visit the occupied cells left
+                    ring_cells = [
+                        cell
+                        for cell in self.cells
+                        if self._cell_distance(center_cell, cell) >= ring
+                    ]
+                    remaining = 0
+                else:
+                    ring_cells = self._ring_cells(center_cell, ring)
+                for cell in ring_cells:
+                    for item_id in self.cells.get(cell, ()):
+                        remaining = max(remaining - 1, 0)
+                        distance = math.dist(center, self.positions[item_id])
+                        if max_distance is not None and distance > max_distance:
+                            continue
+                        if len(best) < k:
+                            heapq.heappush(best, (-distance, item_id))
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, (-distance, item_id))
+                ring += 1
+        return sorted(
+            ((item_id, -distance) for distance, item_id in best),
+            key=lambda item: item[1],
+        )
+
+    @staticmethod
+    def _cell_distance(cell: Cell, other_cell: Cell) -> int:
+        return max(abs(c - o) for c, o in zip(cell, other_cell))
+
+    @staticmethod
+    def _ring_cells(center_cell: Cell, ring: int) -> Iterator[Cell]:
+        """Cells at exactly ring cells (Chebyshev distance) from the center cell."""
+        if ring == 0:
+            yield center_cell
+            return
+        for offset in itertools.product(
+            range(-ring, ring + 1), repeat=len(center_cell)
+        ):
+            if max(abs(o) for o in offset) == ring:
+                yield tuple(c + o for c, o in zip(center_cell, offset))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.positions
@@ -0,0 +1,155 @@
+from typing import List, Optional, Sequence, Tuple, Type
+from genworlds.worlds.abstracts.world import AbstractWorld
+from genworlds.worlds.abstracts.world_entity import AbstractWorldEntity
+from genworlds.agents.abstracts.agent import AbstractAgent
+from genworlds.objects.abstracts.object import AbstractObject
+from genworlds.events.abstracts.action import AbstractAction
+
+from genworlds.worlds.concrete.coordinate_based.actions import (
+    WorldSendsNearbyEntities,
+    WorldSendsNearbyActionSchemas,
+    WorldSetsAgentPosition,
+)
+from genworlds.worlds.concrete.coordinate_based.spatial_index import UniformGridIndex
+
+
+class WorldCoordinateEntity(AbstractWorldEntity):
+    position: List[float] = None
+
+
+class CoordinateWorld(AbstractWorld[WorldCoordinateEntity]):
+    """
+    World where the entities have 2D or 3D coordinates.
+
+    The entities available to an agent are the ones within perception_radius of it, or
+    only the max_nearby_entities closest ones when set. Entities without a position, like
+    the world itself, are available from everywhere.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        agents: List[AbstractAgent] = [],
+        objects: List[AbstractObject] = [],
+        actions: List[Type[AbstractAction]] = [],
+        id: str = None,
+        perception_radius: float = 10.0,
+        max_nearby_entities: int = None,
+        cell_size: float = None,
+        initial_positions: dict[str, List[float]] = None,
+        interest_radius: Optional[float] = None,
+        interest_management: bool = True,
+    ):
+        self.perception_radius = perception_radius
+        # broadcast events of the entities only reach the entities within interest_radius
+        # (perception_radius by default) of them
+        self.interest_radius = interest_radius or perception_radius
+        self.interest_management = interest_management
+        self.max_nearby_entities = max_nearby_entities
+        self.spatial_index = UniformGridIndex(cell_size or perception_radius)
+        self.entity_positions: dict[str, List[float]] = dict(initial_positions or {})
+        self.global_entity_ids: set[str] = set()
+        # availability = near the sender id
+        get_available_entities = WorldSendsNearbyEntities(host_object=self)
+        get_available_action_schemas = WorldSendsNearbyActionSchemas(host_object=self)
+
+        actions.append(get_available_entities)
+        actions.append(get_available_action_schemas)
+        actions.append(WorldSetsAgentPosition(host_object=self))
+
+        super().__init__(
+            name=name,
+            description=description,
+            agents=agents,
+            objects=objects,
+            actions=actions,
+            get_available_entities=get_available_entities,
+            get_available_action_schemas=get_available_action_schemas,
+            id=id,
+        )
+
+    def get_entity_from_obj(self, obj: AbstractObject) -> WorldCoordinateEntity:
+        entity = WorldCoordinateEntity.create(obj)
+        # updating a registered entity keeps its position
+        entity.position = self.entity_positions.get(obj.id)
+        return entity
+
+    def register_entity(self, obj: AbstractObject):
+        super().register_entity(obj)
+        self._index_entity(obj.id, self.entity_positions.get(obj.id))
+
+    def unregister_entity(self, entity_id: str):
+        super().unregister_entity(entity_id)
+        self.entity_positions.pop(entity_id, None)
+        self.spatial_index.remove(entity_id)
+        self.global_entity_ids.discard(entity_id)
+        self._update_interest(entity_id, None)
+
+    def move_entity(self, entity_id: str, position: Sequence[float]):
+        position = list(position)
+        if len(position) not in (2, 3):
+            raise ValueError(f"Position {position} must have 2 or 3 coordinates")
+        with self._registry_lock:
+            entity = self.entities[entity_id].copy(update={"position": position})
+            self.entities = {**self.entities, entity_id: entity}
+            self.versioned_entities.set(entity_id, entity)
+        self.entity_positions[entity_id] = position
+        self._index_entity(entity_id, position)
+
+    def _index_entity(self, entity_id: str, position: Optional[List[float]]):
+        if position is None:
+            self.spatial_index.remove(entity_id)
+            self.global_entity_ids.add(entity_id)
+        else:
+            self.global_entity_ids.discard(entity_id)
+            self.spatial_index.insert(entity_id, position)
+        self._update_interest(entity_id, position)
+
+    def _update_interest(self, entity_id: str, position: Optional[List[float]]):
+        if self.interest_management and entity_id != self.id:
+            self.simulation_socket_client.update_interest(
+                entity_id, position=position, radius=self.interest_radius
+            )
+
+    def get_entities_near(
+        self, position: Sequence[float], radius: float = None, k: int = None
+    ) -> List[Tuple[str, float]]:
+        """(entity_id, distance) of the entities within radius, or the k closest ones."""
+        if k is not None:
+            return self.spatial_index.nearest(position, k, max_distance=radius)
+        return self.spatial_index.query_radius(
+            position, radius or self.perception_radius
+        )
+
+    def get_nearby_entity_ids(self, entity_id: str) -> set[str]:
+        nearby_entity_ids = {entity_id, *self.global_entity_ids}
+        position = self.entity_positions.get(entity_id)
+        if position is None:
+            return nearby_entity_ids
+        k = None
+        if self.max_nearby_entities is not None:
+            # the entity itself is the closest one
+            k = self.max_nearby_entities + 1
+        for nearby_entity_id, _ in self.get_entities_near(
+            position, self.perception_radius, k
+        ):
+            nearby_entity_ids.add(nearby_entity_id)
+        return nearby_entity_ids
+
+    def get_nearby_entities(self, entity_id: str) -> dict:
+        entities = self.entities
+        return {
+            nearby_entity_id: entities[nearby_entity_id]
+            for nearby_entity_id in self.get_nearby_entity_ids(entity_id)
+            if nearby_entity_id in entities
+        }
+
+    def get_nearby_action_schemas(self, entity_id: str) -> dict[str, str]:
+        action_schemas = self.action_schemas
+        nearby_action_schemas = {}
+        for nearby_entity_id in self.get_nearby_entity_ids(entity_id):
+            for key in self.entity_action_schema_keys.get(nearby_entity_id, []):
+                if key in action_schemas:
+                    nearby_action_schemas[key] = action_schemas[key]
+        return nearby_action_schemas
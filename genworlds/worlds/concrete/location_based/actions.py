@@ -2,7 +2,7 @@ from genworlds.events.abstracts.event import AbstractEvent
 from genworlds.events.abstracts.action import AbstractAction
 from genworlds.objects.abstracts.object import AbstractObject
 from genworlds.worlds.concrete.base.actions import (
-    AgentGetsAvailableEntitiesEvent,
+    AgentWantsUpdatedStateEvent,
     WorldSendsAvailableEntitiesEvent,
     WorldSendsAvailableActionSchemasEvent,
 )
@@ -21,18 +21,13 @@ class WorldSetsAgentLocationEvent(AbstractEvent):
 
 class WorldSetsAgentLocation(AbstractAction):
     trigger_event_class = AgentMovesToNewLocation
+    description = "The world sets the new location of the agent."
 
     def __init__(self, host_object: AbstractObject):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: AgentMovesToNewLocation):
-        if event.destination_location not in self.host_object.locations:
-            raise ValueError(
-                f"Destination location {event.destination_location} is not in world locations {self.host_object.locations}"
-            )
-        self.host_object.get_entity_by_id(
-            event.sender_id
-        ).location = event.destination_location
+        self.host_object.move_entity(event.sender_id, event.destination_location)
         event = WorldSetsAgentLocationEvent(
             sender_id=self.host_object.id,
         )
@@ -40,45 +35,56 @@ class WorldSetsAgentLocation(AbstractAction):
 
 
 class WorldSendsSameLocationEntities(AbstractAction):
-    trigger_event_class = AgentGetsAvailableEntitiesEvent
+    trigger_event_class = AgentWantsUpdatedStateEvent
+    description = "Send the entities in the same location as the agent."
 
     def __init__(self, host_object: AbstractObject):
         super().__init__(host_object=host_object)
 
-    def __call__(self, event: AgentGetsAvailableEntitiesEvent):
-        self.host_object.update_entities()
+    def __call__(self, event: AgentWantsUpdatedStateEvent):
         sender_entity = self.host_object.get_entity_by_id(event.sender_id)
-        same_location_entities = {}
-        for entity_id, entity in self.host_object.entities.items():
-            if entity.location == sender_entity.location:
-                same_location_entities[entity_id] = entity
+        same_location_entities = self.host_object.get_location_entities(
+            sender_entity.location
+        )
+        delta = self.host_object.versioned_entities.diff(
+            event.sender_id, event.entities_version, same_location_entities
+        )
         event = WorldSendsAvailableEntitiesEvent(
             sender_id=self.host_object.id,
             target_id=event.sender_id,
-            available_entities=same_location_entities,
+            correlation_id=event.correlation_id,
+            available_entities=delta.changed,
+            removed_entities=delta.removed,
+            version=delta.version,
+            base_version=delta.base_version,
         )
         self.host_object.send_event(event)
 
 
 class WorldSendsSameLocationActionSchemas(AbstractAction):
-    trigger_event_class = AgentGetsAvailableEntitiesEvent  ## change that!!
+    trigger_event_class = AgentWantsUpdatedStateEvent
+    description = "Send the action schemas in the same location as the agent."
 
     def __init__(self, host_object: AbstractObject):
         super().__init__(host_object=host_object)
 
-    def __call__(self, event: AgentGetsAvailableEntitiesEvent):
-        self.host_object.update_action_schemas()
+    def __call__(self, event: AgentWantsUpdatedStateEvent):
         sender_entity = self.host_object.get_entity_by_id(event.sender_id)
-        sender_location = sender_entity.location
-        same_location_action_schemas = {}
-        for action_schema_id, action_schema in self.host_object.action_schemas.items():
-            entity_id = action_schema_id.split(":")[0]
-            entity_location = self.host_object.get_entity_by_id(entity_id).location
-            if entity_location == sender_location:
-                same_location_action_schemas[action_schema_id] = action_schema
+        same_location_action_schemas = self.host_object.get_location_action_schemas(
+            sender_entity.location
+        )
+        delta = self.host_object.versioned_action_schemas.diff(
+            event.sender_id, event.action_schemas_version, same_location_action_schemas
+        )
         event = WorldSendsAvailableActionSchemasEvent(
             sender_id=self.host_object.id,
             target_id=event.sender_id,
-            available_action_schemas=same_location_action_schemas,
+            correlation_id=event.correlation_id,
+            world_name=self.host_object.name,
+            world_description=self.host_object.description,
+            available_action_schemas=delta.changed,
+            removed_action_schemas=delta.removed,
+            version=delta.version,
+            base_version=delta.base_version,
         )
         self.host_object.send_event(event)
@@ -1,4 +1,5 @@
-from typing import List, Type
+import threading
+from typing import List, Optional, Type
 from genworlds.worlds.abstracts.world import AbstractWorld
 from genworlds.worlds.abstracts.world_entity import AbstractWorldEntity
 from genworlds.agents.abstracts.agent import AbstractAgent
@@ -28,8 +29,17 @@ class LocationWorld(AbstractWorld[WorldLocationEntity]):
         objects: List[AbstractObject] = [],
         actions: List[Type[AbstractAction]] = [],
         id: str = None,
+        interest_management: bool = True,
     ):
         self.locations = locations
+        # broadcast events of the entities only reach the entities in their location
+        self.interest_management = interest_management
+        # location -> ids of the entities in it, and location -> their action schemas,
+        # so the "what's here" queries only look at the occupants of one location
+        self.location_entities: dict[Optional[str], set[str]] = {}
+        self.location_action_schemas: dict[Optional[str], dict[str, str]] = {}
+        self.entity_locations: dict[str, Optional[str]] = {}
+        self._location_index_lock = threading.Lock()
         # availability = same location as sender id
         get_available_entities = WorldSendsSameLocationEntities(host_object=self)
         get_available_action_schemas = WorldSendsSameLocationActionSchemas(
@@ -51,6 +61,75 @@ class LocationWorld(AbstractWorld[WorldLocationEntity]):
             id=id,
         )
 
+    def get_entity_from_obj(self, obj: AbstractObject) -> WorldLocationEntity:
+        entity = WorldLocationEntity.create(obj)
+        # updating a registered entity keeps its location
+        entity.location = self.entity_locations.get(obj.id)
+        return entity
+
+    def register_entity(self, obj: AbstractObject):
+        super().register_entity(obj)
+        self._index_entity(obj.id, self.entities[obj.id].location)
+
+    def unregister_entity(self, entity_id: str):
+        super().unregister_entity(entity_id)
+        self._index_entity(entity_id, None, remove=True)
+
+    def move_entity(self, entity_id: str, location: str):
+        if location not in self.locations:
+            raise ValueError(
+                f"Destination location {location} is not in world locations {self.locations}"
+            )
+        with self._registry_lock:
+            entity = self.entities[entity_id].copy(update={"location": location})
+            self.entities = {**self.entities, entity_id: entity}
+            self.versioned_entities.set(entity_id, entity)
+        self._index_entity(entity_id, location)
+
+    def _index_entity(self, entity_id: str, location: Optional[str], remove=False):
+        with self._location_index_lock:
+            updated_locations = set()
+            if entity_id in self.entity_locations:
+                previous_location = self.entity_locations.pop(entity_id)
+                # replaced instead of mutated, the readers iterate them without locking
+                self.location_entities[previous_location] = self.location_entities[
+                    previous_location
+                ] - {entity_id}
+                updated_locations.add(previous_location)
+            if not remove:
+                self.entity_locations[entity_id] = location
+                self.location_entities[location] = self.location_entities.get(
+                    location, set()
+                ) | {entity_id}
+                updated_locations.add(location)
+
+            # read without the registry lock, the keys of an entity being unregistered
+            # meanwhile can be missing
+            action_schemas = self.action_schemas
+            for updated_location in updated_locations:
+                location_action_schemas = {}
+                for occupant_id in self.location_entities[updated_location]:
+                    for key in self.entity_action_schema_keys.get(occupant_id, []):
+                        if key in action_schemas:
+                            location_action_schemas[key] = action_schemas[key]
+                self.location_action_schemas[updated_location] = location_action_schemas
+
+        if self.interest_management and entity_id != self.id:
+            self.simulation_socket_client.update_interest(
+                entity_id, location=None if remove else location
+            )
+
+    def get_location_entities(self, location: Optional[str]) -> dict:
+        entities = self.entities
+        return {
+            entity_id: entities[entity_id]
+            for entity_id in self.location_entities.get(location, ())
+            if entity_id in entities
+        }
+
+    def get_location_action_schemas(self, location: Optional[str]) -> dict[str, str]:
+        return self.location_action_schemas.get(location, {})
+
     def add_location(self, location: str):
         self.locations.append(location)
 
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from genworlds.agents.abstracts.agent_state import AbstractAgentState
+from genworlds.agents.abstracts.state_manager import AbstractStateManager
+
+
+def make_state(is_asleep: bool) -> AbstractAgentState:
+    return AbstractAgentState(
+        id="agent",
+        name="agent",
+        description="",
+        host_world_prompt="",
+        memory_ignored_event_types=set(),
+        wakeup_event_types=set(),
+        action_schema_chains=[],
+        goals=[],
+        plan=[],
+        last_retrieved_memory="",
+        other_thoughts_filled_parameters={},
+        available_action_schemas={},
+        available_entities=[],
+        is_asleep=is_asleep,
+        current_action_chain=[],
+    )
+
+
+class InheritedInitStateManager(AbstractStateManager):
+    def get_updated_state(self) -> AbstractAgentState:
+        return self.state
+
+
+class NoSuperInitStateManager(AbstractStateManager):
+    def __init__(self, state: AbstractAgentState):
+        self.state = state
+
+    def get_updated_state(self) -> AbstractAgentState:
+        return self.state
+
+
+def test_subclass_without_init_wakes_up():
+    state_manager = InheritedInitStateManager()
+    state_manager.state = make_state(is_asleep=True)
+    assert not state_manager.wait_until_awake(timeout=0.01)
+
+    threading.Timer(0.05, state_manager.wake_up).start()
+    assert state_manager.wait_until_awake(timeout=2)
+
+
+def test_subclass_without_super_init_stops():
+    state_manager = NoSuperInitStateManager(make_state(is_asleep=True))
+    threading.Timer(0.05, state_manager.stop).start()
+    assert not state_manager.wait_until_awake(timeout=2)
+    assert state_manager.is_stopped
+
+
+def test_await_awake_without_super_init():
+    state_manager = NoSuperInitStateManager(make_state(is_asleep=True))
+
+    async def scenario():
+        waiter = asyncio.create_task(state_manager.await_awake())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        state_manager.wake_up()
+        await asyncio.wait_for(waiter, timeout=2)
+
+    asyncio.run(scenario())
@@ -0,0 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from genworlds.simulation.sockets.handlers.action_executor import ActionExecutor
+
+
+def test_process_pool_is_rejected():
+    process_pool = ProcessPoolExecutor(max_workers=1)
+    try:
+        with pytest.raises(ValueError):
+            ActionExecutor(executor=process_pool)
+    finally:
+        process_pool.shutdown()
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from genworlds.simulation.sockets.control_messages import (
+    interest_message,
+    register_message,
+)
+from genworlds.simulation.sockets.server import WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.received.append(json.loads(data))
+
+    async def close(self):
+        pass
+
+
+async def connect(manager: WebSocketManager, *entity_ids: str) -> FakeWebSocket:
+    websocket = FakeWebSocket()
+    await manager.connect(websocket)
+    await manager.handle_message(websocket, register_message(list(entity_ids)))
+    return websocket
+
+
+async def broadcast(manager: WebSocketManager, websocket: FakeWebSocket, sender_id):
+    await manager.handle_message(
+        websocket, json.dumps({"event_type": "said", "sender_id": sender_id})
+    )
+
+
+def test_interest_survives_reconnection_of_the_entity():
+    async def scenario():
+        manager = WebSocketManager()
+        world = await connect(manager, "world")
+        agent = await connect(manager, "agent")
+        neighbour = await connect(manager, "neighbour")
+        stranger = await connect(manager, "stranger")
+        for entity_id, location in [
+            ("agent", "kitchen"),
+            ("neighbour", "kitchen"),
+            ("stranger", "garden"),
+        ]:
+            await manager.handle_message(world, interest_message(entity_id, location))
+
+        await manager.disconnect(agent)
+        agent = await connect(manager, "agent")
+
+        await broadcast(manager, stranger, "stranger")
+        await broadcast(manager, neighbour, "neighbour")
+        await asyncio.sleep(0.05)
+        return [event["sender_id"] for event in agent.received]
+
+    assert asyncio.run(scenario()) == ["neighbour"]
+
+
+def test_interest_is_cleared_with_the_connection_that_set_it():
+    async def scenario():
+        manager = WebSocketManager()
+        world = await connect(manager, "world")
+        await connect(manager, "agent")
+        await manager.handle_message(world, interest_message("agent", "kitchen"))
+        assert manager.interest_manager.has_area("agent")
+
+        await manager.disconnect(world)
+        return manager.interest_manager.has_area("agent")
+
+    assert not asyncio.run(scenario())
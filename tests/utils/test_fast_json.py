@@ -0,0 +1,15 @@
+import json
+
+from genworlds.utils import fast_json
+
+
+def test_dumps_forwards_formatting_options():
+    obj = {"b": 1, "a": [1, 2]}
+    assert fast_json.dumps(obj, indent=2, sort_keys=True) == json.dumps(
+        obj, indent=2, sort_keys=True
+    )
+
+
+def test_dumps_roundtrip():
+    obj = {"b": 1, "a": [1, 2], "c": None}
+    assert fast_json.loads(fast_json.dumps(obj)) == obj
@@ -2,6 +2,7 @@ import os
 from genworlds.objects.abstracts.object import AbstractObject
 from genworlds.events.abstracts.action import AbstractAction
 from genworlds.events.abstracts.event import AbstractEvent
+from genworlds.simulation.sockets.handlers.action_executor import ActionExecutor
 
 import PyPDF2
 from docx import Document as DocxDocument
@@ -37,6 +38,8 @@ class FolderConversionCompleted(AbstractEvent):
 class ConvertFolderToTxt(AbstractAction):
     trigger_event_class = AgentRequestsFolderConversion
     description = "Converts all supported documents in a specific folder to a single txt file."
+    # Converting large folders would block the socket thread
+    executor = ActionExecutor(max_workers=1, name="Local Storage Bucket Actions")
     def __init__(self, host_object: AbstractObject):
         super().__init__(host_object=host_object)
     
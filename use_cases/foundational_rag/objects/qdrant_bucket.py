@@ -2,7 +2,6 @@ import os
 import json
 from json import JSONDecodeError
 from typing import List
-import threading
 
 from qdrant_client import QdrantClient
 from langchain.chat_models import ChatOpenAI
@@ -15,6 +14,11 @@ from langchain.text_splitter import CharacterTextSplitter, TokenTextSplitter
 from genworlds.objects.abstracts.object import AbstractObject
 from genworlds.events.abstracts.event import AbstractEvent
 from genworlds.events.abstracts.action import AbstractAction
+from genworlds.simulation.sockets.handlers.action_executor import ActionExecutor
+
+# Runs the slow vector store actions out of the socket thread, otherwise the client
+# can not ping the server while working and gets disconnected due to timeout
+qdrant_action_executor = ActionExecutor(max_workers=2, name="Qdrant Bucket Actions")
 
 # Define the QdrantBucket Object
 class QdrantBucket(AbstractObject):
@@ -55,14 +59,12 @@ class AgentGeneratesTextChunkCollection(AbstractEvent):
 class GenerateTextChunkCollection(AbstractAction):
     trigger_event_class = AgentGeneratesTextChunkCollection
     description = "Action that generates a collection of text chunks for storage in Qdrant."
+    executor = qdrant_action_executor
     def __init__(self, host_object: AbstractObject):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: AgentGeneratesTextChunkCollection):
-        # If is not threaded the socket disconnects the client due to timeout (it can not ping the server while working)
-        threading.Thread(
-            target=self._agent_generates_text_chunk_collection, args=(event,)
-        ).start()
+        self._agent_generates_text_chunk_collection(event)
 
     # Function that executes the action of generating a text chunk collection in a qdrant vector store
     def _agent_generates_text_chunk_collection(
@@ -122,14 +124,12 @@ class AgentGeneratesNERCollection(AbstractEvent):
 class GenerateNERCollection(AbstractAction):
     trigger_event_class = AgentGeneratesNERCollection
     description = "Action that generates a collection of named entities extracted from a provided text."
+    executor = qdrant_action_executor
     def __init__(self, host_object: AbstractObject):
         super().__init__(host_object=host_object)
 
     def __call__(self, event: AgentGeneratesNERCollection):
-        # If is not threaded the socket disconnects the client due to timeout (it can not ping the server while working)
-        threading.Thread(
-            target=self._agent_generates_ner_collection, args=(event,)
-        ).start()
+        self._agent_generates_ner_collection(event)
 
     # Function that executes the action of generating a text chunk collection in a qdrant vector store
     def _agent_generates_ner_collection(self, event: AgentGeneratesNERCollection):
@@ -257,6 +257,7 @@ class VectorStoreCollectionSimilarChunks(AbstractEvent):
 class RetrieveChunksBySimilarity(AbstractAction):
     trigger_event_class = VectorStoreCollectionRetrieveQuery
     description = "Retrieves a list of text chunks from a Qdrant collection that are similar to a given query."
+    executor = qdrant_action_executor
     def __init__(self, host_object: AbstractObject):
         super().__init__(host_object=host_object)
 
@@ -8,6 +8,7 @@ import threading
 import time
 from genworlds.simulation.sockets.simulation_socket_client import SimulationSocketClient
 from genworlds.simulation.sockets.server import start_thread
+from genworlds.simulation.journal.writer import EventJournalWriter
 
 from world_setup import (
     launch_use_case,
@@ -48,12 +49,6 @@ def get_use_case_list():
     return world_definitions
 
 
-def write_dict_to_file(dict_obj, filepath):
-    with open(filepath, "w") as f:  # 'w' for write mode
-        f.write(json.dumps(dict_obj))  # convert dict to str using json.dumps
-        f.write("\n")  # add a newline at the end for readability
-
-
 def start_server_and_simulation(use_case, world_definition, port):
     module_name = f"use_cases.{use_case}.world_setup"
     function_name = "launch_use_case"
@@ -65,17 +60,16 @@ def start_server_and_simulation(use_case, world_definition, port):
     start_thread(port=port)
 
     # start the recorder
-    file_path = os.path.join(
+    journal_path = os.path.join(
         "use_cases",
         use_case,
         "world_definitions",
-        world_definition + ".mocked_record.json",
+        world_definition + ".mocked_record.journal",
     )
-    events = []
+    journal = EventJournalWriter(journal_path)
 
     def process_event(event):
-        events.append(event)
-        write_dict_to_file({"events": events}, file_path)
+        journal.append(json.dumps(event))
 
     websocket_url = f"ws://127.0.0.1:{port}/ws"
     socket_recorder = SimulationSocketClient(